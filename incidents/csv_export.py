@@ -1,16 +1,128 @@
 import csv
 
-from django.db.models import Case, When
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 
 from incidents.models import Incident
-from incidents.views import ALLOWED_ORDER_BY_FIELDS_WITH_DESC, BOOLEAN_FILTER_FIELDS, CHOICE_FILTER_FIELDS, apply_filters
+from incidents.views import BOOLEAN_FILTER_FIELDS, CHOICE_FILTER_FIELDS, apply_filters, apply_ordering, rank_by_ids
 from ppg_incidents.ai_communication import ai_communicator
 from ppg_incidents.fts_store import search_fts
 from ppg_incidents.vector_store import search_similar
 
 
+class Echo:
+    """File-like object that returns written values instead of buffering them."""
+
+    def write(self, value):
+        return value
+
+
+def _choice_labels(field):
+    return dict(Incident._meta.get_field(field).flatchoices)
+
+
+def _text(value):
+    return value or ''
+
+
+def _yes_no(value):
+    return 'Yes' if value else 'No' if value is False else ''
+
+
+def _yes(value):
+    return 'Yes' if value else ''
+
+
+def _collapse(value):
+    return ', '.join(value) if value else ''
+
+
+def _display(field):
+    labels = _choice_labels(field)
+    return lambda value: labels.get(value, value) if value else ''
+
+
+# (header, field, formatter) for each exported column
+CSV_COLUMNS = [
+    ('UUID', 'uuid', str),
+    ('Title', 'title', _text),
+    ('Date', 'date', _text),
+    ('Time', 'time', _text),
+    ('Country', 'country', _text),
+    ('City/Site', 'city_or_site', _text),
+    ('Severity', 'severity', _display('severity')),
+    ('Potentially Fatal', 'potentially_fatal', _yes_no),
+    ('Flight Phase', 'flight_phase', _display('flight_phase')),
+    ('Flight Altitude', 'flight_altitude', _text),
+    ('Pilot Name', 'pilot_name', _text),
+    ('Pilot Actions', 'pilot_actions', _display('pilot_actions')),
+    ('Primary Cause', 'primary_cause', _display('primary_cause')),
+    ('Hardware Failure', 'hardware_failure', _yes_no),
+    ('Bad Hardware Preflight', 'bad_hardware_preflight', _yes_no),
+    ('Reserve Use', 'reserve_use', _display('reserve_use')),
+    ('Surface Type', 'surface_type', _text),
+    ('Paramotor Type', 'paramotor_type', _display('paramotor_type')),
+    ('Paramotor Frame', 'paramotor_frame', _text),
+    ('Paramotor Engine', 'paramotor_engine', _text),
+    ('Wing Manufacturer', 'wing_manufacturer', _text),
+    ('Wing Model', 'wing_model', _text),
+    ('Wing Size', 'wing_size', _text),
+    ('Wind Speed', 'wind_speed', _text),
+    ('Wind Speed (m/s)', 'wind_speed_ms', _text),
+    ('Meteorological Conditions', 'meteorological_conditions', _text),
+    ('Thermal Conditions', 'thermal_conditions', _text),
+    ('Cause Confidence', 'cause_confidence', _display('cause_confidence')),
+    ('Collapse Types', 'collapse_types', _collapse),
+    ('Factor Low Altitude', 'factor_low_altitude', _yes),
+    ('Factor Maneuvers', 'factor_maneuvers', _yes),
+    ('Factor Accelerator', 'factor_accelerator', _display('factor_accelerator')),
+    ('Factor Thermal Weather', 'factor_thermal_weather', _yes),
+    ('Factor Rain', 'factor_rain', _yes),
+    ('Factor Rotor Turbulence', 'factor_rotor_turbulence', _yes),
+    ('Factor Wake Turbulence', 'factor_wake_turbulence', _yes),
+    ('Factor Trimmer Position', 'factor_trimmer_position', _display('factor_trimmer_position')),
+    ('Factor Reflex Profile', 'factor_reflex_profile', _yes),
+    ('Factor Helmet Missing', 'factor_helmet_missing', _yes),
+    ('Factor Tree Collision', 'factor_tree_collision', _yes),
+    ('Factor Water Landing', 'factor_water_landing', _yes),
+    ('Factor Ground Starting', 'factor_ground_starting', _yes),
+    ('Factor Powerline Collision', 'factor_powerline_collision', _yes),
+    ('Factor Turbulent Conditions', 'factor_turbulent_conditions', _yes),
+    ('Factor Spiral Maneuver', 'factor_spiral_maneuver', _yes),
+    ('Factor Mid Air Collision', 'factor_mid_air_collision', _display('factor_mid_air_collision')),
+    ('Factor Ground Object Collision', 'factor_ground_object_collision', _yes),
+    ('Factor Released Brake Toggle', 'factor_released_brake_toggle', _yes),
+    ('Factor Wrongly Adjusted Trims', 'factor_wrongly_adjusted_trims', _yes),
+    ('Factor Accidental Motor Kill', 'factor_accidental_motor_kill', _yes),
+    ('Factor Wrong Throttle Management', 'factor_wrong_throttle_management', _yes),
+    ('Factor Accidental Reserve Deployment', 'factor_accidental_reserve_deployment', _yes),
+    ('Factor Oscillations Out Of Control', 'factor_oscillations_out_of_control', _yes),
+    ('Factor Student Pilot', 'factor_student_pilot', _yes),
+    ('Factor Medical Issues', 'factor_medical_issues', _yes),
+    ('Factor Engine Failure', 'factor_engine_failure', _yes),
+    ('Factor Trimmers Failure', 'factor_trimmers_failure', _yes),
+    ('Factor Structural Failure', 'factor_structural_failure', _yes),
+    ('Factor Fire', 'factor_fire', _yes),
+    ('Factor Throttle System Issues', 'factor_throttle_system_issues', _yes),
+    ('Factor Paraglider Failure', 'factor_paraglider_failure', _yes),
+    ('Summary', 'summary', _text),
+    ('Description', 'description', _text),
+    ('Causes Description', 'causes_description', _text),
+    ('Injury Details', 'injury_details', _text),
+    ('Pilot Details', 'pilot_details', _text),
+    ('Source Links', 'source_links', _text),
+    ('Media Links', 'media_links', _text),
+]
+
+
+def _csv_rows(rows):
+    yield [header for header, _, _ in CSV_COLUMNS]
+    formatters = [formatter for _, _, formatter in CSV_COLUMNS]
+    for row in rows:
+        yield [formatter(value) for formatter, value in zip(formatters, row)]
+
+
 class IncidentCSVExportView(APIView):
     def get(self, request):
         semantic_search = request.query_params.get("semantic_search")
@@ -20,17 +132,16 @@ class IncidentCSVExportView(APIView):
             embedding = ai_communicator.get_embedding(semantic_search)
             results = search_similar(embedding, limit=10000)
             incident_ids = [r[0] for r in results]
-            preserved_order = Case(*[When(id=id, then=pos) for pos, id in enumerate(incident_ids)])
-            queryset = Incident.objects.filter(id__in=incident_ids).order_by(preserved_order)
+            queryset = rank_by_ids(Incident.objects.all(), incident_ids)
         elif text_search:
-            incident_ids = search_fts(text_search, limit=10000)
-            preserved_order = Case(*[When(id=id, then=pos) for pos, id in enumerate(incident_ids)])
-            queryset = Incident.objects.filter(id__in=incident_ids).order_by(preserved_order)
+            try:
+                incident_ids = search_fts(text_search, limit=10000)
+            except ValueError as e:
+                raise ValidationError({"text_search": str(e)})
+            queryset = rank_by_ids(Incident.objects.all(), incident_ids)
         else:
             queryset = Incident.objects.all()
-            order_by = request.query_params.get("order_by")
-            if order_by and order_by in ALLOWED_ORDER_BY_FIELDS_WITH_DESC:
-                queryset = queryset.order_by(order_by)
+            queryset = apply_ordering(queryset, request.query_params.get("order_by"))
 
         include_filters = {}
         for field in BOOLEAN_FILTER_FIELDS + CHOICE_FILTER_FIELDS + ["collapse", "stall", "spin", "line_twist", "unknown_collapse", "has_video"]:
@@ -86,104 +197,13 @@ class IncidentCSVExportView(APIView):
                 next_month = f"{year}-{month + 1:02d}-01"
             queryset = queryset.filter(date__lt=next_month)
 
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="incidents.csv"'
+        writer = csv.writer(Echo())
+        rows = queryset.values_list(*[field for _, field, _ in CSV_COLUMNS]).iterator(chunk_size=500)
 
-        writer = csv.writer(response)
-        
-        writer.writerow([
-            'UUID', 'Title', 'Date', 'Time', 'Country', 'City/Site', 'Severity', 'Potentially Fatal',
-            'Flight Phase', 'Flight Altitude', 'Pilot Name', 'Pilot Actions', 'Primary Cause',
-            'Hardware Failure', 'Bad Hardware Preflight', 'Reserve Use', 'Surface Type',
-            'Paramotor Type', 'Paramotor Frame', 'Paramotor Engine',
-            'Wing Manufacturer', 'Wing Model', 'Wing Size',
-            'Wind Speed', 'Wind Speed (m/s)', 'Meteorological Conditions', 'Thermal Conditions',
-            'Cause Confidence', 'Collapse Types',
-            'Factor Low Altitude', 'Factor Maneuvers', 'Factor Accelerator', 'Factor Thermal Weather',
-            'Factor Rain', 'Factor Rotor Turbulence', 'Factor Wake Turbulence', 'Factor Trimmer Position',
-            'Factor Reflex Profile', 'Factor Helmet Missing', 'Factor Tree Collision', 'Factor Water Landing',
-            'Factor Ground Starting', 'Factor Powerline Collision', 'Factor Turbulent Conditions',
-            'Factor Spiral Maneuver', 'Factor Mid Air Collision', 'Factor Ground Object Collision',
-            'Factor Released Brake Toggle', 'Factor Wrongly Adjusted Trims', 'Factor Accidental Motor Kill',
-            'Factor Wrong Throttle Management', 'Factor Accidental Reserve Deployment',
-            'Factor Oscillations Out Of Control', 'Factor Student Pilot', 'Factor Medical Issues',
-            'Factor Engine Failure', 'Factor Trimmers Failure', 'Factor Structural Failure',
-            'Factor Fire', 'Factor Throttle System Issues', 'Factor Paraglider Failure',
-            'Summary', 'Description', 'Causes Description', 'Injury Details', 'Pilot Details',
-            'Source Links', 'Media Links'
-        ])
-
-        for incident in queryset:
-            writer.writerow([
-                str(incident.uuid),
-                incident.title or '',
-                incident.date or '',
-                incident.time or '',
-                incident.country or '',
-                incident.city_or_site or '',
-                incident.get_severity_display() if incident.severity else '',
-                'Yes' if incident.potentially_fatal else 'No' if incident.potentially_fatal is False else '',
-                incident.get_flight_phase_display() if incident.flight_phase else '',
-                incident.flight_altitude or '',
-                incident.pilot_name or '',
-                incident.get_pilot_actions_display() if incident.pilot_actions else '',
-                incident.get_primary_cause_display() if incident.primary_cause else '',
-                'Yes' if incident.hardware_failure else 'No' if incident.hardware_failure is False else '',
-                'Yes' if incident.bad_hardware_preflight else 'No' if incident.bad_hardware_preflight is False else '',
-                incident.get_reserve_use_display() if incident.reserve_use else '',
-                incident.surface_type or '',
-                incident.get_paramotor_type_display() if incident.paramotor_type else '',
-                incident.paramotor_frame or '',
-                incident.paramotor_engine or '',
-                incident.wing_manufacturer or '',
-                incident.wing_model or '',
-                incident.wing_size or '',
-                incident.wind_speed or '',
-                incident.wind_speed_ms or '',
-                incident.meteorological_conditions or '',
-                incident.thermal_conditions or '',
-                incident.get_cause_confidence_display() if incident.cause_confidence else '',
-                ', '.join(incident.collapse_types) if incident.collapse_types else '',
-                'Yes' if incident.factor_low_altitude else '',
-                'Yes' if incident.factor_maneuvers else '',
-                incident.get_factor_accelerator_display() if incident.factor_accelerator else '',
-                'Yes' if incident.factor_thermal_weather else '',
-                'Yes' if incident.factor_rain else '',
-                'Yes' if incident.factor_rotor_turbulence else '',
-                'Yes' if incident.factor_wake_turbulence else '',
-                incident.get_factor_trimmer_position_display() if incident.factor_trimmer_position else '',
-                'Yes' if incident.factor_reflex_profile else '',
-                'Yes' if incident.factor_helmet_missing else '',
-                'Yes' if incident.factor_tree_collision else '',
-                'Yes' if incident.factor_water_landing else '',
-                'Yes' if incident.factor_ground_starting else '',
-                'Yes' if incident.factor_powerline_collision else '',
-                'Yes' if incident.factor_turbulent_conditions else '',
-                'Yes' if incident.factor_spiral_maneuver else '',
-                incident.get_factor_mid_air_collision_display() if incident.factor_mid_air_collision else '',
-                'Yes' if incident.factor_ground_object_collision else '',
-                'Yes' if incident.factor_released_brake_toggle else '',
-                'Yes' if incident.factor_wrongly_adjusted_trims else '',
-                'Yes' if incident.factor_accidental_motor_kill else '',
-                'Yes' if incident.factor_wrong_throttle_management else '',
-                'Yes' if incident.factor_accidental_reserve_deployment else '',
-                'Yes' if incident.factor_oscillations_out_of_control else '',
-                'Yes' if incident.factor_student_pilot else '',
-                'Yes' if incident.factor_medical_issues else '',
-                'Yes' if incident.factor_engine_failure else '',
-                'Yes' if incident.factor_trimmers_failure else '',
-                'Yes' if incident.factor_structural_failure else '',
-                'Yes' if incident.factor_fire else '',
-                'Yes' if incident.factor_throttle_system_issues else '',
-                'Yes' if incident.factor_paraglider_failure else '',
-                incident.summary or '',
-                incident.description or '',
-                incident.causes_description or '',
-                incident.injury_details or '',
-                incident.pilot_details or '',
-                incident.source_links or '',
-                incident.media_links or ''
-            ])
+        response = StreamingHttpResponse(
+            (writer.writerow(row) for row in _csv_rows(rows)),
+            content_type='text/csv',
+        )
+        response['Content-Disposition'] = 'attachment; filename="incidents.csv"'
 
         return response
-
@@ -0,0 +1,143 @@
+import datetime
+
+from django.db.models import Q
+
+from incidents.models import IncidentCollapseType, IncidentLink
+
+
+# Boolean fields that can be filtered
+BOOLEAN_FILTER_FIELDS = [
+    "potentially_fatal",
+    "hardware_failure",
+    "bad_hardware_preflight",
+    "factor_low_altitude",
+    "factor_maneuvers",
+    "factor_thermal_weather",
+    "factor_rain",
+    "factor_rotor_turbulence",
+    "factor_wake_turbulence",
+    "factor_wind_shear",
+    "factor_gust_front",
+    "factor_reflex_profile",
+    "factor_helmet_missing",
+    "factor_tree_collision",
+    "factor_water_landing",
+    "factor_ground_starting",
+    "factor_powerline_collision",
+    "factor_turbulent_conditions",
+    "factor_spiral_maneuver",
+    "factor_ground_object_collision",
+    "factor_released_brake_toggle",
+    "factor_wrongly_adjusted_trims",
+    "factor_accidental_motor_kill",
+    "factor_wrong_throttle_management",
+    "factor_accidental_reserve_deployment",
+    "factor_oscillations_out_of_control",
+    "factor_student_pilot",
+    "factor_medical_issues",
+    "factor_engine_failure",
+    "factor_out_of_fuel",
+    "factor_trimmers_failure",
+    "factor_structural_failure",
+    "factor_fire",
+    "factor_throttle_system_issues",
+    "factor_paraglider_failure",
+]
+
+# Choice fields that can be filtered
+CHOICE_FILTER_FIELDS = [
+    "flight_phase",
+    "severity",
+    "reserve_use",
+    "cause_confidence",
+    "paramotor_type",
+    "factor_accelerator",
+    "factor_trimmer_position",
+    "pilot_actions",
+    "factor_mid_air_collision",
+    "primary_cause",
+]
+
+
+# Collapse filters and the collapse types each of them matches
+COLLAPSE_FILTER_TYPES = {
+    "collapse": ["asymmetric_small", "asymmetric_medium", "asymmetric_large", "frontal", "unknown"],
+    "stall": ["full_stall"],
+    "spin": ["spin"],
+    "line_twist": ["line_twist"],
+    "unknown_collapse": ["unknown"],
+}
+
+
+def is_true(value):
+    return value is True or (isinstance(value, str) and value.lower() == "true")
+
+
+def is_false(value):
+    return value is False or (isinstance(value, str) and value.lower() == "false")
+
+
+def _filter_q(field, value):
+    """Build the Q matching a single include filter, or None if the filter is a no-op."""
+    if field == "wind_speed_ms_min":
+        return Q(wind_speed_ms__gte=float(value))
+    elif field == "wind_speed_ms_max":
+        return Q(wind_speed_ms__lt=float(value))
+    elif field == "altitude_min":
+        return Q(flight_altitude__gte=int(value))
+    elif field == "altitude_max":
+        return Q(flight_altitude__lt=int(value))
+    elif field == "altitude_not_null":
+        if is_true(value):
+            return Q(flight_altitude__isnull=False)
+    elif field == "wind_speed_ms_not_null":
+        if is_true(value):
+            return Q(wind_speed_ms__isnull=False)
+    elif field == "year_min":
+        # Plain date bounds keep year filters on the date indexes
+        return Q(date__gte=datetime.date(int(value), 1, 1))
+    elif field == "year_max":
+        return Q(date__lt=datetime.date(int(value) + 1, 1, 1))
+    elif field in BOOLEAN_FILTER_FIELDS:
+        if is_true(value):
+            return Q(**{field: True})
+        elif is_false(value):
+            return Q(**{field: False})
+    elif field in CHOICE_FILTER_FIELDS:
+        if isinstance(value, list):
+            values = value
+        else:
+            values = [v.strip() for v in str(value).split(",")]
+        if "null" in values:
+            values = [v for v in values if v != "null"]
+            if values:
+                return Q(**{f"{field}__isnull": True}) | Q(**{f"{field}__in": values})
+            return Q(**{f"{field}__isnull": True})
+        return Q(**{f"{field}__in": values})
+    elif field in COLLAPSE_FILTER_TYPES:
+        if is_true(value):
+            # An uncorrelated IN lets SQLite start from the (collapse_type, incident) index
+            return Q(pk__in=IncidentCollapseType.objects.filter(
+                collapse_type__in=COLLAPSE_FILTER_TYPES[field],
+            ).values("incident_id"))
+    elif field == "has_video":
+        if is_true(value):
+            # youtube_id is either NULL or an 11-character id; a range condition (unlike IS NOT NULL)
+            # lets SQLite read the youtube_id index
+            return Q(pk__in=IncidentLink.objects.filter(youtube_id__gt="").values("incident_id"))
+    return None
+
+
+def build_filter_q(filters, exclude=False):
+    """Combine include or exclude filters into a single Q (excluded filters are negated)."""
+    q = Q()
+    for field, value in filters.items():
+        field_q = _filter_q(field, value)
+        if field_q is not None:
+            q &= ~field_q if exclude else field_q
+    return q
+
+
+def apply_filters(queryset, filters, exclude=False):
+    """Apply include or exclude filters to a queryset."""
+    return queryset.filter(build_filter_q(filters, exclude))
@@ -0,0 +1,46 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+YOUTUBE_VIDEO_PATTERN = re.compile(
+    r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|embed/|shorts/|live/)|youtu\.be/)([a-zA-Z0-9_-]{11})',
+    re.IGNORECASE,
+)
+
+# Query parameters that never identify the linked resource
+IGNORED_QUERY_PARAMS = {"fbclid", "gclid", "si", "feature", "ref"}
+
+
+def split_links(text: str | None) -> list[str]:
+    """Split a one-link-per-line field into stripped, non-empty links."""
+    if not text:
+        return []
+    return [link.strip() for link in text.split("\n") if link.strip()]
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL for duplicate detection: drop scheme, "www.", fragment,
+    trailing slash and tracking parameters, sort the query and lowercase the result
+    (matching is case-insensitive, like the icontains checks it replaces).
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = f"http://{url}"
+    parts = urlsplit(url)
+    host = parts.netloc
+    if host.lower().startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in IGNORED_QUERY_PARAMS and not key.startswith("utm_")
+    )
+    canonical = f"{host}{path}"
+    if query:
+        canonical += f"?{urlencode(query)}"
+    return canonical.lower()
+
+
+def youtube_video_id(url: str) -> str | None:
+    match = YOUTUBE_VIDEO_PATTERN.search(url)
+    return match.group(1) if match else None
@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 
 from incidents.models import Incident
-from ppg_incidents.fts_store import delete_fts, get_indexed_incident_ids
+from ppg_incidents.fts_store import get_indexed_incident_ids, rebuild_fts
 from ppg_incidents.vector_store import delete_embedding, get_embedded_incident_ids
 
 
@@ -21,9 +21,10 @@ class Command(BaseCommand):
         indexed_ids = get_indexed_incident_ids()
         orphaned_fts = indexed_ids - existing_ids
         self.stdout.write(f"Found {len(orphaned_fts)} orphaned FTS entries")
-        for incident_id in orphaned_fts:
-            delete_fts(incident_id)
-            self.stdout.write(f"Deleted FTS entry for incident {incident_id}")
+        if orphaned_fts:
+            # External-content FTS rows can only be removed with their original text; rebuild instead
+            rebuild_fts()
+            self.stdout.write("Rebuilt FTS index")
 
         self.stdout.write(self.style.SUCCESS("Done."))
 
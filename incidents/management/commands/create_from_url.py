@@ -6,15 +6,14 @@ import time
 import urllib.request
 
 import certifi
-from django.db.models import Q
 from django.core.management.base import BaseCommand
 
-from incidents.models import Incident
+from incidents.models import Incident, IncidentLink
+from incidents.search_index import refresh_search_index
 from incidents.serializers import IncidentSerializer
 from ppg_incidents.ai_communication import ai_communicator
 from ppg_incidents.bhpa_parser import parse_bhpa_formal_html, parse_bhpa_html
 from ppg_incidents.downloader import get_webpage_content
-from ppg_incidents.vector_store import upsert_embedding
 
 USPPA_LIST_PATTERN = re.compile(r"^https?://usppa\.org/incidents/(\?.*)?$")
 USPPA_ENTRY_PATTERN = re.compile(r"https://usppa\.org/incidents/entry/\d+")
@@ -181,7 +180,7 @@ class Command(BaseCommand):
                     continue
             else:
                 duplicates = Incident.all_objects.filter(
-                    Q(source_links__icontains=usppa_url) | Q(media_links__icontains=usppa_url)
+                    id__in=IncidentLink.matching([usppa_url]).values("incident_id")
                 )
                 if duplicates.exists() and not force:
                     self.stdout.write(self.style.WARNING(f"Duplicate found by USPPA URL"))
@@ -220,8 +219,7 @@ class Command(BaseCommand):
                 serializer.is_valid(raise_exception=True)
                 incident = serializer.save()
 
-                embedding = ai_communicator.get_embedding(incident.to_text())
-                upsert_embedding(incident.id, embedding)
+                refresh_search_index(incident)
 
                 self.stdout.write(self.style.SUCCESS(f"Created incident: {incident.uuid}"))
 
@@ -275,6 +273,9 @@ class Command(BaseCommand):
                     existing.source_links = bhpa_incident.pdf_url
                     existing.report_raw = pdf_content
                     existing.save()
+
+                    refresh_search_index(existing)
+
                     self.stdout.write(self.style.SUCCESS(f"Updated incident: {existing.uuid}"))
                     continue
 
@@ -305,8 +306,7 @@ class Command(BaseCommand):
                 serializer.is_valid(raise_exception=True)
                 incident = serializer.save()
 
-                embedding = ai_communicator.get_embedding(incident.to_text())
-                upsert_embedding(incident.id, embedding)
+                refresh_search_index(incident)
 
                 self.stdout.write(self.style.SUCCESS(f"Created incident: {incident.uuid}"))
 
@@ -365,8 +365,7 @@ class Command(BaseCommand):
                 serializer.is_valid(raise_exception=True)
                 incident = serializer.save()
 
-                embedding = ai_communicator.get_embedding(incident.to_text())
-                upsert_embedding(incident.id, embedding)
+                refresh_search_index(incident)
 
                 self.stdout.write(self.style.SUCCESS(f"Created incident: {incident.uuid}"))
 
@@ -393,7 +392,7 @@ class Command(BaseCommand):
                     return False
         else:
             duplicates = Incident.all_objects.filter(
-                Q(source_links__icontains=check_url) | Q(media_links__icontains=check_url)
+                id__in=IncidentLink.matching([check_url]).values("incident_id")
             )
             if duplicates.exists() and not force:
                 self.stdout.write(self.style.WARNING(f"URL already used in {duplicates.count()} incident(s)"))
@@ -433,8 +432,7 @@ class Command(BaseCommand):
             serializer.is_valid(raise_exception=True)
             incident = serializer.save()
 
-            embedding = ai_communicator.get_embedding(incident.to_text())
-            upsert_embedding(incident.id, embedding)
+            refresh_search_index(incident)
 
             self.stdout.write(self.style.SUCCESS(f"Created incident: {incident.uuid}"))
         
@@ -1,8 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from django.core.management.base import BaseCommand
+from django.db import transaction
 
 from incidents.models import Incident
-from ppg_incidents.ai_communication import ai_communicator
-from ppg_incidents.vector_store import get_embedded_incident_ids, init_vector_table, upsert_embedding
+from ppg_incidents.ai_communication import EMBEDDING_MAX_CHARS, EMBEDDING_MODEL, ai_communicator, split_embedding_batches
+from ppg_incidents.embedding_cache import get_cached_embeddings, store_embeddings
+from ppg_incidents.vector_store import get_embedded_incident_ids, init_vector_table, upsert_embeddings
+
+
+def _index_embeddings(incidents: list[Incident], embeddings: list[list[float]]):
+    """Write embeddings to vec_incidents and mark the embedded search_text as indexed, in one transaction."""
+    with transaction.atomic():
+        upsert_embeddings([(incident.id, embedding) for incident, embedding in zip(incidents, embeddings)])
+        for incident in incidents:
+            incident.indexed_hash = incident.search_hash
+        # bulk_update skips save() and the post_save handlers; nothing user-visible changes
+        Incident.all_objects.bulk_update(incidents, ["indexed_hash"], batch_size=500)
 
 
 class Command(BaseCommand):
@@ -10,12 +24,14 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument("--force", action="store_true", help="Regenerate all embeddings")
+        parser.add_argument("--workers", type=int, default=4, help="Number of batches requested in parallel")
+        parser.add_argument("--after-id", type=int, default=0, help="Resume: only process incidents with id greater than this")
 
     def handle(self, *args, **options):
         init_vector_table()
 
         existing_ids = get_embedded_incident_ids()
-        incidents = Incident.objects.all()
+        incidents = Incident.objects.filter(id__gt=options["after_id"]).order_by("id")
 
         if options["force"]:
             to_process = list(incidents)
@@ -28,12 +44,30 @@ class Command(BaseCommand):
         if skipped > 0:
             self.stdout.write(f"Skipping {skipped} incidents with existing embeddings")
 
-        self.stdout.write(f"Generating embeddings for {total} incidents...")
+        texts = [incident.search_text[:EMBEDDING_MAX_CHARS] for incident in to_process]
+        embeddings = get_cached_embeddings(EMBEDDING_MODEL, texts)
 
-        for i, incident in enumerate(to_process, 1):
-            embedding = ai_communicator.get_embedding(incident.to_text())
-            upsert_embedding(incident.id, embedding)
-            self.stdout.write(f"[{i}/{total}] {incident}")
+        cached = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+        if cached:
+            _index_embeddings([to_process[i] for i in cached], [embeddings[i] for i in cached])
+            self.stdout.write(f"Stored {len(cached)} embeddings from the cache")
 
-        self.stdout.write(self.style.SUCCESS(f"Done. Generated {total} embeddings."))
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        batches = [[missing[j] for j in batch] for batch in split_embedding_batches([texts[i] for i in missing])]
 
+        self.stdout.write(f"Generating embeddings for {len(missing)} incidents in {len(batches)} batches...")
+
+        done = len(cached)
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            # Workers only call the API; cache and vector writes stay on this thread's connection
+            # so they never contend for the SQLite write lock.
+            # map() yields in submission order, so batches are committed in id order
+            # and the last reported id is always a safe --after-id resume point
+            results = executor.map(ai_communicator.fetch_embeddings, [[texts[i] for i in batch] for batch in batches])
+            for batch, batch_embeddings in zip(batches, results):
+                store_embeddings(EMBEDDING_MODEL, [(texts[i], embedding) for i, embedding in zip(batch, batch_embeddings)])
+                _index_embeddings([to_process[i] for i in batch], batch_embeddings)
+                done += len(batch)
+                self.stdout.write(f"[{done}/{total}] Stored batch up to incident id {to_process[batch[-1]].id}")
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Generated {total} embeddings."))
@@ -0,0 +1,38 @@
+import hashlib
+
+from django.core.management.base import BaseCommand
+
+from incidents.models import DataVersion, Incident
+from incidents.search_index import refresh_search_index
+
+
+class Command(BaseCommand):
+    help = "Recompute stored search_text for all incidents (after changing Incident.to_text())"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reindex", action="store_true", help="Also refresh embeddings of changed incidents")
+
+    def handle(self, *args, **options):
+        changed = []
+        for incident in Incident.all_objects.iterator(chunk_size=500):
+            text = incident.to_text()
+            text_hash = hashlib.sha256(text.encode()).hexdigest()
+            if text_hash != incident.search_hash:
+                incident.search_text = text
+                incident.search_hash = text_hash
+                incident.search_extra = incident.to_text(fts_columns=False)
+                changed.append(incident)
+
+        # bulk_update skips save() and the post_save handlers; only the search document changes
+        Incident.all_objects.bulk_update(changed, ["search_text", "search_extra", "search_hash"], batch_size=500)
+        if changed:
+            # text_content, FTS results and the responses cached on the data version all change
+            DataVersion.bump()
+        self.stdout.write(f"Updated search text of {len(changed)} incidents")
+
+        if options["reindex"]:
+            for incident in changed:
+                refresh_search_index(incident)
+            self.stdout.write(f"Reindexed {len(changed)} incidents")
+
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,62 @@
+# Generated by Django 6.0 on 2026-10-17 13:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_collapse_types(apps, schema_editor):
+    Incident = apps.get_model("incidents", "Incident")
+    IncidentCollapseType = apps.get_model("incidents", "IncidentCollapseType")
+    rows = []
+    for incident_id, collapse_types in Incident.objects.exclude(collapse_types__isnull=True).values_list("id", "collapse_types"):
+        for collapse_type in set(collapse_types or []):
+            rows.append(IncidentCollapseType(incident_id=incident_id, collapse_type=collapse_type))
+    IncidentCollapseType.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("incidents", "0038_dataversion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IncidentCollapseType",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("collapse_type", models.CharField(max_length=30)),
+                (
+                    "incident",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="collapse_type_rows",
+                        to="incidents.incident",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["collapse_type", "incident"],
+                        name="collapse_type_incident_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("incident", "collapse_type"),
+                        name="unique_incident_collapse_type",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_collapse_types, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 6.0 on 2026-10-17 14:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from incidents.links import canonicalize_url, split_links, youtube_video_id
+
+
+def populate_links(apps, schema_editor):
+    Incident = apps.get_model("incidents", "Incident")
+    IncidentLink = apps.get_model("incidents", "IncidentLink")
+    rows = []
+    for incident_id, source_links, media_links in Incident.objects.values_list("id", "source_links", "media_links"):
+        for url in dict.fromkeys(split_links(source_links) + split_links(media_links)):
+            rows.append(IncidentLink(
+                incident_id=incident_id,
+                url=url,
+                canonical_url=canonicalize_url(url),
+                youtube_id=youtube_video_id(url),
+            ))
+    IncidentLink.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("incidents", "0039_incidentcollapsetype"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IncidentLink",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("url", models.TextField()),
+                ("canonical_url", models.CharField(db_index=True, max_length=2000)),
+                (
+                    "youtube_id",
+                    models.CharField(blank=True, db_index=True, max_length=11, null=True),
+                ),
+                (
+                    "incident",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="link_rows",
+                        to="incidents.incident",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(populate_links, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-17 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("incidents", "0040_incidentlink"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="incident",
+            index=models.Index(fields=["verified", "date", "id"], name="incident_keyset_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="incident",
+            index=models.Index(fields=["verified", "created_at", "id"], name="incident_keyset_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="incident",
+            index=models.Index(fields=["verified", "updated_at", "id"], name="incident_keyset_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="incident",
+            index=models.Index(fields=["verified", "flight_altitude", "id"], name="incident_keyset_altitude_idx"),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-17 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("incidents", "0041_incident_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="incident",
+            index=models.Index(fields=["verified", "date", "time"], name="incident_verified_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="incident",
+            index=models.Index(fields=["verified", "country"], name="incident_verified_country_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="incident",
+            index=models.Index(fields=["country", "date", "verified"], name="incident_country_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="incident",
+            index=models.Index(fields=["country", "pilot_name", "verified"], name="incident_country_pilot_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="incident",
+            index=models.Index(fields=["original_uuid", "created_at"], name="incident_original_uuid_idx"),
+        ),
+    ]
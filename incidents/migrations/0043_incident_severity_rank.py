@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-17 16:05
+
+from django.db import migrations, models
+
+SEVERITY_RANKS = {"minor": 1, "serious": 2, "fatal": 3}
+
+
+def populate_severity_rank(apps, schema_editor):
+    Incident = apps.get_model("incidents", "Incident")
+    for severity, rank in SEVERITY_RANKS.items():
+        Incident.objects.filter(severity=severity).update(severity_rank=rank)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("incidents", "0042_incident_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="incident",
+            name="severity_rank",
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(populate_severity_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="incident",
+            index=models.Index(fields=["verified", "severity_rank", "date"], name="incident_severity_rank_idx"),
+        ),
+    ]
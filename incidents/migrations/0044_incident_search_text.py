@@ -0,0 +1,260 @@
+# Generated by Django 6.0 on 2026-10-17 16:40
+
+import hashlib
+
+from django.db import migrations, models
+
+
+COLLAPSE_TYPE_LABELS = {
+    "asymmetric_small": "Asymmetric collapse (<30%)",
+    "asymmetric_medium": "Asymmetric collapse (30-50%)",
+    "asymmetric_large": "Asymmetric collapse (>50%)",
+    "frontal": "Frontal collapse",
+    "full_stall": "Full stall",
+    "spin": "Spin",
+    "line_twist": "Line twist",
+    "cravatte": "Cravatte",
+    "unknown": "Unknown collapse",
+}
+
+
+def to_text(incident, fts_columns=True) -> str:
+    """Frozen copy of Incident.to_text() as of this migration, for historical model instances."""
+    parts = []
+
+    # Core text fields
+    if fts_columns:
+        if incident.title:
+            parts.append(f"Title: {incident.title}")
+        if incident.summary:
+            parts.append(f"Summary: {incident.summary}")
+        if incident.description:
+            parts.append(f"Description: {incident.description}")
+        if incident.causes_description:
+            parts.append(f"Causes: {incident.causes_description}")
+    if incident.injury_details:
+        parts.append(f"Injuries: {incident.injury_details}")
+
+    # Date and location
+    if incident.date:
+        parts.append(f"Date: {incident.date}")
+    if incident.time:
+        parts.append(f"Time: {incident.time}")
+    if incident.country:
+        parts.append(f"Country: {incident.country}")
+    if incident.city_or_site:
+        parts.append(f"Location: {incident.city_or_site}")
+
+    # Equipment
+    if incident.paramotor_type:
+        parts.append(f"Paramotor type: {incident.get_paramotor_type_display()}")
+    if incident.paramotor_frame:
+        parts.append(f"Frame: {incident.paramotor_frame}")
+    if incident.paramotor_engine:
+        parts.append(f"Engine: {incident.paramotor_engine}")
+    if incident.wing_manufacturer:
+        parts.append(f"Wing manufacturer: {incident.wing_manufacturer}")
+    if incident.wing_model:
+        parts.append(f"Wing model: {incident.wing_model}")
+    if incident.wing_size:
+        parts.append(f"Wing size: {incident.wing_size}")
+
+    # Pilot
+    if incident.pilot_name:
+        parts.append(f"Pilot name: {incident.pilot_name}")
+    if incident.pilot_details:
+        parts.append(f"Pilot details: {incident.pilot_details}")
+
+    # Flight details
+    if incident.flight_altitude:
+        parts.append(f"Altitude: {incident.flight_altitude}m")
+    if incident.flight_phase:
+        parts.append(f"Flight phase: {incident.get_flight_phase_display()}")
+
+    # Incident details
+    if incident.severity:
+        parts.append(f"Severity: {incident.get_severity_display()}")
+    if incident.potentially_fatal is not None:
+        parts.append(f"Potentially fatal: {'yes' if incident.potentially_fatal else 'no'}")
+    if incident.pilot_actions:
+        parts.append(f"Pilot actions: {incident.get_pilot_actions_display()}")
+    if incident.primary_cause:
+        parts.append(f"Primary cause: {incident.get_primary_cause_display()}")
+
+    # Hardware
+    if incident.hardware_failure is not None:
+        parts.append(f"Hardware failure: {'yes' if incident.hardware_failure else 'no'}")
+    if incident.bad_hardware_preflight is not None:
+        parts.append(f"Hardware issue detectable on preflight: {'yes' if incident.bad_hardware_preflight else 'no'}")
+
+    # Collapse types
+    if incident.collapse_types:
+        collapse_labels = []
+        for ct in incident.collapse_types:
+            label = COLLAPSE_TYPE_LABELS.get(ct, ct)
+            collapse_labels.append(label)
+        parts.append(f"Collapse sequence: {', '.join(collapse_labels)}")
+
+    # Reserve
+    if incident.reserve_use:
+        parts.append(f"Reserve: {incident.get_reserve_use_display()}")
+
+    # Surface
+    if incident.surface_type:
+        parts.append(f"Surface: {incident.surface_type}")
+
+    # Confidence
+    if incident.cause_confidence:
+        parts.append(f"Cause confidence: {incident.get_cause_confidence_display()}")
+
+    # Factors
+    factors = []
+    if incident.factor_low_altitude:
+        factors.append("low altitude")
+    if incident.factor_maneuvers:
+        factors.append("maneuvers")
+    if incident.factor_accelerator:
+        factors.append(f"accelerator {incident.get_factor_accelerator_display()}")
+    if incident.factor_thermal_weather:
+        factors.append("thermal weather")
+    if incident.factor_rain:
+        factors.append("rain")
+    if incident.factor_rotor_turbulence:
+        factors.append("rotor turbulence")
+    if incident.factor_wake_turbulence:
+        factors.append("wake turbulence")
+    if incident.factor_wind_shear:
+        factors.append("wind shear")
+    if incident.factor_gust_front:
+        factors.append("gust front")
+    if incident.factor_trimmer_position:
+        factors.append(f"trimmer {incident.get_factor_trimmer_position_display()}")
+    if incident.factor_reflex_profile:
+        factors.append("reflex profile")
+    if incident.factor_helmet_missing:
+        factors.append("no helmet")
+    if incident.factor_tree_collision:
+        factors.append("tree collision")
+    if incident.factor_water_landing:
+        factors.append("water landing")
+    if incident.factor_ground_starting:
+        factors.append("ground starting")
+    if incident.factor_powerline_collision:
+        factors.append("powerline collision")
+    if incident.factor_turbulent_conditions:
+        factors.append("turbulent conditions")
+    if incident.factor_spiral_maneuver:
+        factors.append("spiral maneuver")
+    if incident.factor_mid_air_collision:
+        factors.append(f"mid-air collision: {incident.get_factor_mid_air_collision_display()}")
+    if incident.factor_ground_object_collision:
+        factors.append("ground object collision")
+    if incident.factor_released_brake_toggle:
+        factors.append("released/lost brake toggle")
+    if incident.factor_wrongly_adjusted_trims:
+        factors.append("wrongly adjusted trims")
+    if incident.factor_accidental_motor_kill:
+        factors.append("accidental motor kill")
+    if incident.factor_wrong_throttle_management:
+        factors.append("wrong throttle management")
+    if incident.factor_accidental_reserve_deployment:
+        factors.append("accidental reserve deployment")
+    if incident.factor_oscillations_out_of_control:
+        factors.append("oscillations out of control")
+    if incident.factor_student_pilot:
+        factors.append("student pilot")
+    if incident.factor_medical_issues:
+        factors.append("medical issues")
+    if incident.factor_engine_failure:
+        factors.append("engine failure")
+    if incident.factor_out_of_fuel:
+        factors.append("out of fuel")
+    if incident.factor_trimmers_failure:
+        factors.append("trimmers failure")
+    if incident.factor_structural_failure:
+        factors.append("structural failure")
+    if incident.factor_fire:
+        factors.append("fire")
+    if incident.factor_throttle_system_issues:
+        factors.append("throttle system issues")
+    if incident.factor_paraglider_failure:
+        factors.append("paraglider failure")
+    if factors:
+        parts.append(f"Factors: {', '.join(factors)}")
+
+    # Weather
+    if incident.wind_speed:
+        parts.append(f"Wind: {incident.wind_speed}")
+    if incident.wind_speed_ms:
+        parts.append(f"Wind speed: {incident.wind_speed_ms} m/s")
+    if incident.meteorological_conditions:
+        parts.append(f"Weather: {incident.meteorological_conditions}")
+    if incident.thermal_conditions:
+        parts.append(f"Thermals: {incident.thermal_conditions}")
+
+    # Links and raw reports
+    if incident.source_links:
+        parts.append(f"Source links: {incident.source_links}")
+    if incident.media_links:
+        parts.append(f"Media links: {incident.media_links}")
+    if fts_columns and incident.report_raw:
+        parts.append(f"Raw report: {incident.report_raw}")
+
+    return "\n".join(parts)
+
+
+def populate_search_text(apps, schema_editor):
+    Incident = apps.get_model("incidents", "Incident")
+
+    # Only incidents that already have an embedding were indexed from this text;
+    # the others keep indexed_hash empty so refresh_search_index embeds them
+    embedded_ids = set()
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'vec_incidents'")
+        if cursor.fetchone() is not None:
+            cursor.execute("SELECT incident_id FROM vec_incidents")
+            embedded_ids = {row[0] for row in cursor.fetchall()}
+
+    incidents = list(Incident.objects.all())
+    for incident in incidents:
+        incident.search_text = to_text(incident)
+        incident.search_hash = hashlib.sha256(incident.search_text.encode()).hexdigest()
+        incident.search_extra = to_text(incident, fts_columns=False)
+        if incident.id in embedded_ids:
+            incident.indexed_hash = incident.search_hash
+    Incident.objects.bulk_update(
+        incidents, ["search_text", "search_extra", "search_hash", "indexed_hash"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("incidents", "0043_incident_severity_rank"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="incident",
+            name="search_text",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="incident",
+            name="search_extra",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="incident",
+            name="search_hash",
+            field=models.CharField(default="", editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="incident",
+            name="indexed_hash",
+            field=models.CharField(
+                default="", editable=False, help_text="search_hash last written to the embedding and FTS indexes", max_length=64
+            ),
+        ),
+        migrations.RunPython(populate_search_text, migrations.RunPython.noop),
+    ]
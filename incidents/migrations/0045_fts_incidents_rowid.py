@@ -0,0 +1,36 @@
+# Generated by Django 6.0 on 2026-10-18 09:20
+
+from django.db import migrations
+
+
+def key_fts_by_rowid(apps, schema_editor):
+    """Rebuild fts_incidents(incident_id, content) as fts_incidents(content) with rowid = incident id."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'fts_incidents'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute("PRAGMA table_info(fts_incidents)")
+        if "incident_id" not in {row[1] for row in cursor.fetchall()}:
+            return
+
+        cursor.execute("DROP TABLE IF EXISTS fts_incidents_new")
+        cursor.execute("CREATE VIRTUAL TABLE fts_incidents_new USING fts5(content, tokenize='trigram')")
+        cursor.execute("""
+            INSERT INTO fts_incidents_new (rowid, content)
+            SELECT CAST(incident_id AS INTEGER), content FROM fts_incidents
+            WHERE rowid IN (SELECT MAX(rowid) FROM fts_incidents GROUP BY incident_id)
+        """)
+        cursor.execute("INSERT INTO fts_incidents_new (fts_incidents_new) VALUES ('optimize')")
+        cursor.execute("DROP TABLE fts_incidents")
+        cursor.execute("ALTER TABLE fts_incidents_new RENAME TO fts_incidents")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("incidents", "0044_incident_search_text"),
+    ]
+
+    operations = [
+        migrations.RunPython(key_fts_by_rowid, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 6.0 on 2026-10-18 11:05
+
+from django.db import migrations
+
+TRIGGERS = ["fts_incidents_ai", "fts_incidents_ad", "fts_incidents_au"]
+
+
+def use_external_content(apps, schema_editor):
+    """Replace fts_incidents with an external-content table over search_text, synced by triggers."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS fts_incidents_new")
+        cursor.execute("DROP TABLE IF EXISTS fts_incidents")
+        cursor.execute("""
+            CREATE VIRTUAL TABLE fts_incidents USING fts5(
+                search_text,
+                content='incidents_incident',
+                content_rowid='id',
+                tokenize='trigram'
+            )
+        """)
+        cursor.execute("""
+            CREATE TRIGGER fts_incidents_ai AFTER INSERT ON incidents_incident BEGIN
+                INSERT INTO fts_incidents (rowid, search_text) VALUES (new.id, new.search_text);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER fts_incidents_ad AFTER DELETE ON incidents_incident BEGIN
+                INSERT INTO fts_incidents (fts_incidents, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER fts_incidents_au AFTER UPDATE OF search_text ON incidents_incident BEGIN
+                INSERT INTO fts_incidents (fts_incidents, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+                INSERT INTO fts_incidents (rowid, search_text) VALUES (new.id, new.search_text);
+            END
+        """)
+        cursor.execute("INSERT INTO fts_incidents (fts_incidents) VALUES ('rebuild')")
+        cursor.execute("INSERT INTO fts_incidents (fts_incidents) VALUES ('optimize')")
+
+
+def use_stored_content(apps, schema_editor):
+    """Back to a table that stores its own lowercased copy of the text (rowid = incident id)."""
+    with schema_editor.connection.cursor() as cursor:
+        for trigger in TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute("DROP TABLE IF EXISTS fts_incidents")
+        cursor.execute("CREATE VIRTUAL TABLE fts_incidents USING fts5(content, tokenize='trigram')")
+        cursor.execute("""
+            INSERT INTO fts_incidents (rowid, content)
+            SELECT id, lower(search_text) FROM incidents_incident
+        """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("incidents", "0045_fts_incidents_rowid"),
+    ]
+
+    operations = [
+        migrations.RunPython(use_external_content, use_stored_content),
+    ]
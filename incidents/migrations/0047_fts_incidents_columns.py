@@ -0,0 +1,66 @@
+# Generated by Django 6.0 on 2026-10-18 12:10
+
+from django.db import migrations
+
+TRIGGERS = ["fts_incidents_ai", "fts_incidents_ad", "fts_incidents_au"]
+
+
+def create_fts(cursor, columns):
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+
+    for trigger in TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute("DROP TABLE IF EXISTS fts_incidents")
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE fts_incidents USING fts5(
+            {column_list},
+            content='incidents_incident',
+            content_rowid='id',
+            tokenize='trigram'
+        )
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER fts_incidents_ai AFTER INSERT ON incidents_incident BEGIN
+            INSERT INTO fts_incidents (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER fts_incidents_ad AFTER DELETE ON incidents_incident BEGIN
+            INSERT INTO fts_incidents (fts_incidents, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER fts_incidents_au AFTER UPDATE OF {column_list} ON incidents_incident BEGIN
+            INSERT INTO fts_incidents (fts_incidents, rowid, {column_list}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO fts_incidents (rowid, {column_list}) VALUES (new.id, {new_values});
+        END
+    """)
+    cursor.execute("INSERT INTO fts_incidents (fts_incidents) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO fts_incidents (fts_incidents) VALUES ('optimize')")
+
+
+def index_weighted_columns(apps, schema_editor):
+    """
+    Index title, summary, description, causes and the raw report as separate columns, plus
+    search_extra (the rest of the search document) instead of the whole search_text.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        create_fts(cursor, ["title", "summary", "description", "causes_description", "report_raw", "search_extra"])
+
+
+def index_search_text_only(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        create_fts(cursor, ["search_text"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("incidents", "0046_fts_incidents_external_content"),
+    ]
+
+    operations = [
+        migrations.RunPython(index_weighted_columns, index_search_text_only),
+    ]
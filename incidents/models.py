@@ -1,7 +1,10 @@
+import hashlib
 import uuid
 
 from django.db import models
 
+from incidents.links import canonicalize_url, split_links, youtube_video_id
+
 
 class VerifiedManager(models.Manager):
     def get_queryset(self):
@@ -88,6 +91,12 @@ class Incident(models.Model):
         TORQUE_TWIST = "torque_twist", "Torque Twist"
         GROUND_HANDLING = "ground_handling", "Ground Handling"
 
+    SEVERITY_RANKS = {
+        Severity.MINOR: 1,
+        Severity.SERIOUS: 2,
+        Severity.FATAL: 3,
+    }
+
     # UUID
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     original_uuid = models.UUIDField(null=True, blank=True, help_text="Reference to original document when editing draft")
@@ -124,6 +133,8 @@ class Incident(models.Model):
 
     # Incident details
     severity = models.CharField(max_length=20, choices=Severity.choices, null=True, blank=True)
+    # Denormalized from severity for index-backed ordering (minor < serious < fatal, null if unknown)
+    severity_rank = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
     potentially_fatal = models.BooleanField(
         null=True,
         blank=True,
@@ -206,6 +217,15 @@ class Incident(models.Model):
     # Status
     verified = models.BooleanField(default=False, help_text="Incident has been reviewed and verified")
 
+    # Search document (to_text() stored on save) and its hashes
+    search_text = models.TextField(default="", editable=False)
+    # to_text() without the fields fts_incidents indexes as their own columns
+    search_extra = models.TextField(default="", editable=False)
+    search_hash = models.CharField(max_length=64, default="", editable=False)
+    indexed_hash = models.CharField(
+        max_length=64, default="", editable=False, help_text="search_hash last written to the embedding and FTS indexes"
+    )
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -216,23 +236,58 @@ class Incident(models.Model):
 
     class Meta:
         ordering = ["-date", "-time"]
+        indexes = [
+            # Keyset pagination of the list view (see incidents/pagination.py)
+            models.Index(fields=["verified", "date", "id"], name="incident_keyset_date_idx"),
+            models.Index(fields=["verified", "created_at", "id"], name="incident_keyset_created_idx"),
+            models.Index(fields=["verified", "updated_at", "id"], name="incident_keyset_updated_idx"),
+            models.Index(fields=["verified", "flight_altitude", "id"], name="incident_keyset_altitude_idx"),
+            # Default list ordering and country stats
+            models.Index(fields=["verified", "date", "time"], name="incident_verified_date_idx"),
+            models.Index(fields=["verified", "country"], name="incident_verified_country_idx"),
+            # Duplicate checks by country + date / pilot name
+            models.Index(fields=["country", "date", "verified"], name="incident_country_date_idx"),
+            models.Index(fields=["country", "pilot_name", "verified"], name="incident_country_pilot_idx"),
+            # Drafts of an incident
+            models.Index(fields=["original_uuid", "created_at"], name="incident_original_uuid_idx"),
+            # Ordering by severity
+            models.Index(fields=["verified", "severity_rank", "date"], name="incident_severity_rank_idx"),
+        ]
 
     def __str__(self):
         return f"{self.date} - {self.country} - {self.severity}"
 
-    def to_text(self) -> str:
-        """Convert incident to searchable text for embedding."""
+    def save(self, *args, **kwargs):
+        self.severity_rank = self.SEVERITY_RANKS.get(self.severity)
+        self.search_text = self.to_text()
+        self.search_hash = hashlib.sha256(self.search_text.encode()).hexdigest()
+        self.search_extra = self.to_text(fts_columns=False)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            extra = {"search_text", "search_extra", "search_hash"}
+            if "severity" in update_fields:
+                extra.add("severity_rank")
+            kwargs["update_fields"] = {*update_fields, *extra}
+        super().save(*args, **kwargs)
+
+    def to_text(self, fts_columns: bool = True) -> str:
+        """
+        Convert incident to searchable text for embedding.
+        fts_columns=False leaves out title, summary, description, causes and the raw report,
+        which fts_incidents indexes as their own columns (stored as search_extra).
+        """
         parts = []
 
         # Core text fields
-        if self.title:
-            parts.append(f"Title: {self.title}")
-        if self.summary:
-            parts.append(f"Summary: {self.summary}")
-        if self.description:
-            parts.append(f"Description: {self.description}")
-        if self.causes_description:
-            parts.append(f"Causes: {self.causes_description}")
+        if fts_columns:
+            if self.title:
+                parts.append(f"Title: {self.title}")
+            if self.summary:
+                parts.append(f"Summary: {self.summary}")
+            if self.description:
+                parts.append(f"Description: {self.description}")
+            if self.causes_description:
+                parts.append(f"Causes: {self.causes_description}")
         if self.injury_details:
             parts.append(f"Injuries: {self.injury_details}")
 
@@ -398,7 +453,71 @@ class Incident(models.Model):
             parts.append(f"Source links: {self.source_links}")
         if self.media_links:
             parts.append(f"Media links: {self.media_links}")
-        if self.report_raw:
+        if fts_columns and self.report_raw:
             parts.append(f"Raw report: {self.report_raw}")
 
         return "\n".join(parts)
+
+
+class IncidentCollapseType(models.Model):
+    """One row per collapse type of an incident, mirroring Incident.collapse_types for indexed filtering."""
+
+    incident = models.ForeignKey(Incident, on_delete=models.CASCADE, related_name="collapse_type_rows")
+    collapse_type = models.CharField(max_length=30)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["incident", "collapse_type"], name="unique_incident_collapse_type"),
+        ]
+        indexes = [
+            models.Index(fields=["collapse_type", "incident"], name="collapse_type_incident_idx"),
+        ]
+
+    @classmethod
+    def sync(cls, incident):
+        cls.objects.filter(incident=incident).delete()
+        cls.objects.bulk_create([
+            cls(incident=incident, collapse_type=collapse_type)
+            for collapse_type in set(incident.collapse_types or [])
+        ])
+
+
+class IncidentLink(models.Model):
+    """One row per source/media link of an incident, normalized for indexed duplicate and video lookups."""
+
+    incident = models.ForeignKey(Incident, on_delete=models.CASCADE, related_name="link_rows")
+    url = models.TextField()
+    canonical_url = models.CharField(max_length=2000, db_index=True)
+    youtube_id = models.CharField(max_length=11, null=True, blank=True, db_index=True)
+
+    @classmethod
+    def sync(cls, incident):
+        cls.objects.filter(incident=incident).delete()
+        urls = dict.fromkeys(split_links(incident.source_links) + split_links(incident.media_links))
+        cls.objects.bulk_create([
+            cls(incident=incident, url=url, canonical_url=canonicalize_url(url), youtube_id=youtube_video_id(url))
+            for url in urls
+        ])
+
+    @classmethod
+    def matching(cls, urls):
+        """Links pointing to the same resource as any of urls (same canonical URL or YouTube video)."""
+        q = models.Q(canonical_url__in={canonicalize_url(url) for url in urls})
+        video_ids = {youtube_video_id(url) for url in urls} - {None}
+        if video_ids:
+            q |= models.Q(youtube_id__in=video_ids)
+        return cls.objects.filter(q)
+
+
+class DataVersion(models.Model):
+    """Single-row marker replaced on every Incident write, so caches can detect changes across processes."""
+
+    version = models.UUIDField(default=uuid.uuid4)
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list("version", flat=True).first()
+
+    @classmethod
+    def bump(cls):
+        cls.objects.update_or_create(pk=1, defaults={"version": uuid.uuid4()})
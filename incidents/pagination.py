@@ -0,0 +1,163 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from incidents.models import Incident
+
+# order_by fields that can be browsed with keyset pagination (each has a (verified, field, id) index)
+KEYSET_ORDER_FIELDS = ['date', 'created_at', 'updated_at', 'flight_altitude']
+KEYSET_ORDER_FIELDS_WITH_DESC = KEYSET_ORDER_FIELDS + [f'-{field}' for field in KEYSET_ORDER_FIELDS]
+KEYSET_DEFAULT_ORDER = '-date'
+
+
+def _encode_cursor(value, incident_id) -> str:
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    data = json.dumps({'v': value, 'id': incident_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def _decode_cursor(cursor, field):
+    """Decode a client-supplied cursor, converting its value to the type of the ordering field."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        value, incident_id = data['v'], data['id']
+        if isinstance(incident_id, bool) or not isinstance(incident_id, int):
+            raise TypeError(incident_id)
+        if value is not None:
+            value = Incident._meta.get_field(field).to_python(value)
+        return value, incident_id
+    except (ValueError, KeyError, TypeError, ValidationError):
+        raise NotFound('Invalid cursor')
+
+
+class IncidentPagination(PageNumberPagination):
+    """
+    Page number pagination for the incident list, with two extra modes:
+    - `count=false` skips the COUNT(*) query (`count` is null, `next` is set if another page exists)
+    - `pagination=keyset` seeks with a `cursor` on (order_by field, id) instead of LIMIT/OFFSET,
+      for order_by in KEYSET_ORDER_FIELDS; other orderings and search results fall back to pages
+    """
+    page_size = 15
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.mode = 'pages'
+        self.with_count = request.query_params.get('count', '').lower() not in ('false', '0')
+
+        order_by = request.query_params.get('order_by') or KEYSET_DEFAULT_ORDER
+        searching = request.query_params.get('semantic_search') or request.query_params.get('text_search')
+        if request.query_params.get('pagination') == 'keyset' and not searching \
+                and order_by in KEYSET_ORDER_FIELDS_WITH_DESC:
+            self.mode = 'keyset'
+            return self._paginate_keyset(queryset, order_by)
+
+        if self.with_count:
+            return super().paginate_queryset(queryset, request, view)
+        return self._paginate_without_count(queryset)
+
+    def _paginate_without_count(self, queryset):
+        page_size = self.get_page_size(self.request)
+        try:
+            self.page_number = int(self.request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound('Invalid page')
+        if self.page_number < 1:
+            raise NotFound('Invalid page')
+
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def _paginate_keyset(self, queryset, order_by):
+        """
+        Rows are ordered by (field, id) in the requested direction. SQLite sorts NULLs first
+        ascending and last descending, so the nulls form a separate segment at one end; each
+        segment is read with an index seek from the cursor position.
+        """
+        page_size = self.get_page_size(self.request)
+        field = order_by.lstrip('-')
+        descending = order_by.startswith('-')
+        id_order = '-id' if descending else 'id'
+        cmp, id_cmp = ('lt', 'lt') if descending else ('gt', 'gt')
+        cmp_eq = f'{cmp}e'
+
+        not_null = queryset.filter(**{f'{field}__isnull': False}).order_by(order_by, id_order)
+        null = queryset.filter(**{f'{field}__isnull': True}).order_by(id_order)
+        segments = [(False, not_null), (True, null)] if descending else [(True, null), (False, not_null)]
+
+        cursor = self.request.query_params.get(self.cursor_query_param)
+        if cursor:
+            value, last_id = _decode_cursor(cursor, field)
+            position = next(i for i, (is_null, _) in enumerate(segments) if is_null == (value is None))
+            is_null, segment = segments[position]
+            if is_null:
+                segment = segment.filter(**{f'id__{id_cmp}': last_id})
+            else:
+                segment = segment.filter(
+                    Q(**{f'{field}__{cmp_eq}': value}),
+                    Q(**{f'{field}__{cmp}': value}) | Q(**{f'id__{id_cmp}': last_id}),
+                )
+            segments = [(is_null, segment)] + segments[position + 1:]
+
+        rows = []
+        for _, segment in segments:
+            rows += list(segment[:page_size + 1 - len(rows)])
+            if len(rows) > page_size:
+                break
+
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_cursor = _encode_cursor(getattr(rows[-1], field), rows[-1].id) if self.has_next else None
+        self.keyset_count = queryset.count() if self.with_count else None
+        return rows
+
+    def get_next_link(self):
+        if self.mode == 'keyset':
+            if not self.next_cursor:
+                return None
+            return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+        if self.with_count:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.mode == 'keyset':
+            return None
+        if self.with_count:
+            return super().get_previous_link()
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        if self.mode == 'pages' and self.with_count:
+            return super().get_paginated_response(data)
+        return Response({
+            'count': self.keyset_count if self.mode == 'keyset' else None,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class UnverifiedIncidentPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('created_at', 'id')
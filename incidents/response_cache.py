@@ -0,0 +1,68 @@
+import hashlib
+import json
+from functools import wraps
+
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from incidents.models import DataVersion, Incident
+
+CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(name, request) -> str:
+    """Key on data version + endpoint + canonical JSON of the query params and body."""
+    payload = json.dumps(
+        {"query": sorted(request.query_params.lists()), "body": request.data},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    digest = hashlib.sha256(payload.encode()).hexdigest()
+    return f"stats:{DataVersion.current()}:{name}:{digest}"
+
+
+def cached_response(method):
+    """
+    Cache successful responses of a read-only view method.
+    Any Incident save/delete replaces the data version, which retires all cached entries.
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        key = _cache_key(type(self).__name__, request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, CACHE_TIMEOUT)
+        return response
+
+    return wrapper
+
+
+def _etag(*parts) -> str:
+    return hashlib.sha256(":".join(str(p) for p in parts).encode()).hexdigest()[:32]
+
+
+def incident_etag(request, uuid):
+    """
+    ETag of a single incident: changes whenever the incident is saved, or with the data version,
+    which also covers bulk writes such as refresh_search_text that leave updated_at alone.
+    """
+    updated_at = Incident.all_objects.filter(uuid=uuid).values_list("updated_at", flat=True).first()
+    if updated_at is None:
+        return None
+    return _etag(DataVersion.current(), uuid, updated_at.isoformat(), request.META.get("HTTP_ACCEPT", ""))
+
+
+def incident_list_etag(request):
+    """
+    ETag of a list page: changes with the query string or any incident write.
+    Semantic search ranks by vec_incidents, which is written after (and apart from) the
+    incident save that bumps the data version, so those responses get no ETag.
+    """
+    if request.GET.get("semantic_search"):
+        return None
+    return _etag(DataVersion.current(), request.get_full_path(), request.META.get("HTTP_ACCEPT", ""))
@@ -0,0 +1,21 @@
+from incidents.models import Incident
+from ppg_incidents.ai_communication import ai_communicator
+from ppg_incidents.vector_store import upsert_embedding
+
+
+def refresh_search_index(incident) -> bool:
+    """
+    Re-embed the incident's stored search_text if it changed since it was last embedded.
+    FTS needs no refresh here: triggers on the incident table keep it in sync with the incident columns.
+    Returns True if the embedding was updated.
+    """
+    if incident.indexed_hash == incident.search_hash:
+        return False
+
+    embedding = ai_communicator.get_embedding(incident.search_text)
+    upsert_embedding(incident.id, embedding)
+
+    # update() skips save() and the post_save handlers; nothing user-visible changes
+    Incident.all_objects.filter(pk=incident.pk).update(indexed_hash=incident.search_hash)
+    incident.indexed_hash = incident.search_hash
+    return True
@@ -1,17 +1,22 @@
+from functools import cache
+
 from rest_framework import serializers
 
 from incidents.models import Incident
 
 
+# Stored search document columns; exposed as text_content instead
+SEARCH_COLUMNS = ["search_text", "search_extra", "search_hash", "indexed_hash"]
+# Columns derived on save that are never part of the API
+EXCLUDED_COLUMNS = SEARCH_COLUMNS + ["severity_rank"]
+
+
 class IncidentSerializer(serializers.ModelSerializer):
-    text_content = serializers.SerializerMethodField()
+    text_content = serializers.CharField(source="search_text", read_only=True)
 
     class Meta:
         model = Incident
-        fields = "__all__"
-
-    def get_text_content(self, obj):
-        return obj.to_text()
+        exclude = EXCLUDED_COLUMNS
 
     def to_internal_value(self, data):
         data = dict(data)
@@ -36,3 +41,35 @@ class IncidentSerializer(serializers.ModelSerializer):
                 data[field_name] = None
         return super().to_internal_value(data)
 
+
+# Fields shown on the incident list pages
+LIST_FIELDS = [
+    "uuid", "title", "date", "time", "country", "city_or_site", "severity", "potentially_fatal",
+    "flight_phase", "summary", "paramotor_type", "paramotor_frame", "wing_manufacturer", "wing_model",
+    "source_links", "media_links", "verified", "created_at", "updated_at",
+]
+
+
+class IncidentListSerializer(serializers.ModelSerializer):
+    """
+    Slim read-only serializer for list pages.
+    Outputs LIST_FIELDS by default, or only the given `fields` (any incident field or text_content).
+    """
+    text_content = serializers.CharField(source="search_text", read_only=True)
+
+    class Meta:
+        model = Incident
+        exclude = EXCLUDED_COLUMNS
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = set(fields or LIST_FIELDS)
+        for field_name in list(self.fields):
+            if field_name not in selected:
+                self.fields.pop(field_name)
+
+    @classmethod
+    @cache
+    def available_fields(cls) -> frozenset[str]:
+        """Every field name that `fields` can select."""
+        return frozenset(cls().get_fields())
@@ -0,0 +1,62 @@
+import sqlite_vec
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from incidents.models import DataVersion, Incident, IncidentCollapseType, IncidentLink
+from ppg_incidents.fts_store import init_fts_table
+
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",  # 64 MB
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA temp_store=MEMORY",
+]
+
+# First migration that leaves fts_incidents in the shape init_fts_table creates
+FTS_MIGRATION = ("incidents", "0047_fts_incidents_columns")
+
+
+@receiver(connection_created)
+def setup_sqlite_connection(sender, connection, **kwargs):
+    """Load sqlite-vec and apply PRAGMAs once per new database connection."""
+    if connection.vendor != "sqlite":
+        return
+
+    conn = connection.connection
+    conn.enable_load_extension(True)
+    sqlite_vec.load(conn)
+    conn.enable_load_extension(False)
+
+    cursor = conn.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+@receiver(post_save, sender=Incident)
+def incident_saved(sender, instance, **kwargs):
+    """Update derived indexes, then invalidate in-memory snapshots and caches."""
+    with transaction.atomic():
+        IncidentCollapseType.sync(instance)
+        IncidentLink.sync(instance)
+        DataVersion.bump()
+
+
+@receiver(post_delete, sender=Incident)
+def incident_deleted(sender, instance, **kwargs):
+    """Invalidate in-memory snapshots and caches."""
+    DataVersion.bump()
+
+
+@receiver(post_migrate)
+def restore_fts_triggers(sender, using, **kwargs):
+    """Migrations that remake incidents_incident drop the FTS sync triggers; re-create them."""
+    if sender.name != "incidents":
+        return
+    if FTS_MIGRATION not in MigrationRecorder(connections[using]).applied_migrations():
+        return
+    init_fts_table()
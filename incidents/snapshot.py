@@ -0,0 +1,222 @@
+import json
+import threading
+
+from cachetools import LRUCache
+
+from incidents.filters import BOOLEAN_FILTER_FIELDS, CHOICE_FILTER_FIELDS, COLLAPSE_FILTER_TYPES, is_false, is_true
+from incidents.links import split_links, youtube_video_id
+from incidents.models import DataVersion, Incident
+
+
+def _to_mask(flags) -> int:
+    """Pack an iterable of booleans into an int bitmask (bit i = row i)."""
+    mask = 0
+    for i, flag in enumerate(flags):
+        if flag:
+            mask |= 1 << i
+    return mask
+
+
+class IncidentSnapshot:
+    """
+    Columnar in-memory copy of the verified incidents.
+    Filters evaluate to int bitmasks over rows, so they combine with &, | and ~
+    and are counted with bit_count(). Semantics match apply_filters, including
+    SQL NULL handling (an exclude filter is the complement of its include filter).
+    """
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.size = len(rows)
+        self.all_mask = (1 << self.size) - 1
+
+        self.ids = [row["id"] for row in rows]
+        self.dates = [row["date"] for row in rows]
+        self.years = [d.year if d else None for d in self.dates]
+        self.countries = [row["country"] for row in rows]
+        self.wind_speeds = [row["wind_speed_ms"] for row in rows]
+        self.altitudes = [row["flight_altitude"] for row in rows]
+
+        self.boolean_masks = {
+            field: (_to_mask(row[field] is True for row in rows), _to_mask(row[field] is False for row in rows))
+            for field in BOOLEAN_FILTER_FIELDS
+        }
+
+        self.choice_masks = {}
+        self.choice_null_masks = {}
+        for field in CHOICE_FILTER_FIELDS:
+            values = [row[field] for row in rows]
+            self.choice_masks[field] = {
+                value: _to_mask(v == value for v in values) for value in set(values) if value is not None
+            }
+            self.choice_null_masks[field] = _to_mask(v is None for v in values)
+
+        collapse_types = [set(row["collapse_types"] or []) for row in rows]
+        self.collapse_masks = {
+            name: _to_mask(not types.isdisjoint(filter_types) for types in collapse_types)
+            for name, filter_types in COLLAPSE_FILTER_TYPES.items()
+        }
+        self.video_mask = _to_mask(
+            any(youtube_video_id(link) for link in split_links(row["source_links"]) + split_links(row["media_links"]))
+            for row in rows
+        )
+
+        self.country_masks = {}
+        for i, country in enumerate(self.countries):
+            if country:
+                self.country_masks[country] = self.country_masks.get(country, 0) | (1 << i)
+        self.year_masks = {}
+        for i, year in enumerate(self.years):
+            if year is not None:
+                self.year_masks[year] = self.year_masks.get(year, 0) | (1 << i)
+
+        # Row indexes with non-null wind speed, sorted by wind speed
+        self.wind_speed_order = sorted(
+            (i for i, ws in enumerate(self.wind_speeds) if ws is not None),
+            key=lambda i: self.wind_speeds[i],
+        )
+
+        dates = [d for d in self.dates if d is not None]
+        self.min_date = min(dates) if dates else None
+        self.max_date = max(dates) if dates else None
+
+        # Per-filter masks keyed by user-supplied (field, value), so the cache is bounded
+        self._mask_cache = LRUCache(maxsize=256)
+        self._mask_lock = threading.Lock()
+        # Sorted wind speeds per filter mask, so repeated percentile queries skip the scan
+        self._wind_speed_cache = LRUCache(maxsize=64)
+        self._wind_speed_lock = threading.Lock()
+
+    @classmethod
+    def build(cls, version):
+        fields = ["id", "date", "country", "wind_speed_ms", "flight_altitude", "collapse_types", "source_links", "media_links"]
+        rows = list(Incident.objects.order_by("id").values(*fields, *BOOLEAN_FILTER_FIELDS, *CHOICE_FILTER_FIELDS))
+        return cls(version, rows)
+
+    def _column_mask(self, column, predicate) -> int:
+        return _to_mask(v is not None and predicate(v) for v in column)
+
+    def _filter_mask(self, field, value) -> int | None:
+        """Bitmask matching a single include filter, or None if the filter is a no-op (see filters._filter_q)."""
+        if field == "wind_speed_ms_min":
+            v = float(value)
+            return self._column_mask(self.wind_speeds, lambda x: x >= v)
+        elif field == "wind_speed_ms_max":
+            v = float(value)
+            return self._column_mask(self.wind_speeds, lambda x: x < v)
+        elif field == "altitude_min":
+            v = int(value)
+            return self._column_mask(self.altitudes, lambda x: x >= v)
+        elif field == "altitude_max":
+            v = int(value)
+            return self._column_mask(self.altitudes, lambda x: x < v)
+        elif field == "altitude_not_null":
+            if is_true(value):
+                return self._column_mask(self.altitudes, lambda x: True)
+        elif field == "wind_speed_ms_not_null":
+            if is_true(value):
+                return self._column_mask(self.wind_speeds, lambda x: True)
+        elif field == "year_min":
+            v = int(value)
+            return self._column_mask(self.years, lambda x: x >= v)
+        elif field == "year_max":
+            v = int(value)
+            return self._column_mask(self.years, lambda x: x <= v)
+        elif field in BOOLEAN_FILTER_FIELDS:
+            true_mask, false_mask = self.boolean_masks[field]
+            if is_true(value):
+                return true_mask
+            elif is_false(value):
+                return false_mask
+        elif field in CHOICE_FILTER_FIELDS:
+            if isinstance(value, list):
+                values = value
+            else:
+                values = [v.strip() for v in str(value).split(",")]
+            mask = 0
+            for v in values:
+                if v == "null":
+                    mask |= self.choice_null_masks[field]
+                else:
+                    mask |= self.choice_masks[field].get(v, 0)
+            return mask
+        elif field in COLLAPSE_FILTER_TYPES:
+            if is_true(value):
+                return self.collapse_masks[field]
+        elif field == "has_video":
+            if is_true(value):
+                return self.video_mask
+        return None
+
+    def _cached_filter_mask(self, field, value):
+        key = (field, json.dumps(value, sort_keys=True))
+        with self._mask_lock:
+            if key in self._mask_cache:
+                return self._mask_cache[key]
+        field_mask = self._filter_mask(field, value)
+        with self._mask_lock:
+            self._mask_cache[key] = field_mask
+        return field_mask
+
+    def filter_mask(self, include_filters, exclude_filters) -> int:
+        """Rows matching all include filters and none of the exclude filters."""
+        mask = self.all_mask
+        for filters, exclude in ((include_filters, False), (exclude_filters, True)):
+            for field, value in filters.items():
+                field_mask = self._cached_filter_mask(field, value)
+                if field_mask is None:
+                    continue
+                mask &= ~field_mask if exclude else field_mask
+        return mask & self.all_mask
+
+    def count(self, mask) -> int:
+        return mask.bit_count()
+
+    def country_counts(self, mask, limit=None) -> list[dict]:
+        counts = [
+            {"country": country, "count": (mask & country_mask).bit_count()}
+            for country, country_mask in self.country_masks.items()
+        ]
+        counts = sorted((c for c in counts if c["count"]), key=lambda c: -c["count"])
+        return counts[:limit] if limit is not None else counts
+
+    def year_counts(self, mask) -> list[dict]:
+        counts = [
+            {"year": year, "count": (mask & year_mask).bit_count()}
+            for year, year_mask in sorted(self.year_masks.items())
+        ]
+        return [c for c in counts if c["count"]]
+
+    def sorted_wind_speeds(self, mask) -> list[float]:
+        with self._wind_speed_lock:
+            speeds = self._wind_speed_cache.get(mask)
+        if speeds is None:
+            speeds = [self.wind_speeds[i] for i in self.wind_speed_order if mask >> i & 1]
+            with self._wind_speed_lock:
+                self._wind_speed_cache[mask] = speeds
+        return speeds
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def get_snapshot() -> IncidentSnapshot:
+    """Return the process-local snapshot, rebuilding it if incidents changed since it was built."""
+    global _snapshot
+    version = DataVersion.current()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = IncidentSnapshot.build(version)
+        return _snapshot
+
+
+def get_current_snapshot() -> IncidentSnapshot | None:
+    """Return the process-local snapshot if it is up to date, without building one."""
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == DataVersion.current():
+        return snapshot
+    return None
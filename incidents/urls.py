@@ -18,6 +18,7 @@ from incidents.views import (
     IncidentListView,
     IncidentSaveView,
     IncidentSearchView,
+    IncidentTextSearchView,
     IncidentUpdateView,
     LogoutView,
     UnverifiedIncidentListView,
@@ -41,6 +42,7 @@ urlpatterns = [
     path("incident/save", IncidentSaveView.as_view(), name="incident-save"),
     path("incident/check_duplicate", CheckDuplicateView.as_view(), name="incident-check-duplicate"),
     path("incidents/search", IncidentSearchView.as_view(), name="incident-search"),
+    path("incidents/text_search", IncidentTextSearchView.as_view(), name="incident-text-search"),
     path("incidents/duplicates", IncidentDuplicatesView.as_view(), name="incident-duplicates"),
     path("dashboard_stats", DashboardStatsView.as_view(), name="dashboard-stats"),
     path("countries", CountriesView.as_view(), name="countries"),
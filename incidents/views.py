@@ -1,20 +1,29 @@
+import json
 import logging
 
-from django.db.models import Case, Count, Max, Min, Q, When
-from django.db.models.functions import ExtractYear
+from django.db.models import Count, F
+from django.db.models.expressions import RawSQL
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import generics
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 
-from incidents.models import Incident
-from incidents.serializers import IncidentSerializer
+from incidents.filters import BOOLEAN_FILTER_FIELDS, CHOICE_FILTER_FIELDS, apply_filters, build_filter_q
+from incidents.links import split_links
+from incidents.models import Incident, IncidentLink
+from incidents.pagination import IncidentPagination, UnverifiedIncidentPagination
+from incidents.response_cache import cached_response, incident_etag, incident_list_etag
+from incidents.search_index import refresh_search_index
+from incidents.serializers import LIST_FIELDS, IncidentListSerializer, IncidentSerializer
+from incidents.snapshot import get_current_snapshot, get_snapshot
 from ppg_incidents.ai_communication import ai_communicator
-from ppg_incidents.fts_store import delete_fts, search_fts, upsert_fts
-from ppg_incidents.vector_store import delete_embedding, search_similar, init_vector_table, upsert_embedding
+from ppg_incidents.fts_store import search_fts, search_fts_snippets
+from ppg_incidents.vector_store import delete_embedding, search_similar, init_vector_table
 
 logger = logging.getLogger(__name__)
 
@@ -63,12 +72,6 @@ class CurrentUserView(APIView):
         })
 
 
-class IncidentPagination(PageNumberPagination):
-    page_size = 15
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
-
 # Allowed fields for ordering
 ALLOWED_ORDER_BY_FIELDS = [
     'date',
@@ -84,198 +87,82 @@ ALLOWED_ORDER_BY_FIELDS = [
 ALLOWED_ORDER_BY_FIELDS_WITH_DESC = ALLOWED_ORDER_BY_FIELDS + [f'-{field}' for field in ALLOWED_ORDER_BY_FIELDS]
 
 
-# Boolean fields that can be filtered
-BOOLEAN_FILTER_FIELDS = [
-    "potentially_fatal",
-    "hardware_failure",
-    "bad_hardware_preflight",
-    "factor_low_altitude",
-    "factor_maneuvers",
-    "factor_thermal_weather",
-    "factor_rain",
-    "factor_rotor_turbulence",
-    "factor_wake_turbulence",
-    "factor_wind_shear",
-    "factor_gust_front",
-    "factor_reflex_profile",
-    "factor_helmet_missing",
-    "factor_tree_collision",
-    "factor_water_landing",
-    "factor_ground_starting",
-    "factor_powerline_collision",
-    "factor_turbulent_conditions",
-    "factor_spiral_maneuver",
-    "factor_ground_object_collision",
-    "factor_released_brake_toggle",
-    "factor_wrongly_adjusted_trims",
-    "factor_accidental_motor_kill",
-    "factor_wrong_throttle_management",
-    "factor_accidental_reserve_deployment",
-    "factor_oscillations_out_of_control",
-    "factor_student_pilot",
-    "factor_medical_issues",
-    "factor_engine_failure",
-    "factor_out_of_fuel",
-    "factor_trimmers_failure",
-    "factor_structural_failure",
-    "factor_fire",
-    "factor_throttle_system_issues",
-    "factor_paraglider_failure",
-]
-
-# Choice fields that can be filtered
-CHOICE_FILTER_FIELDS = [
-    "flight_phase",
-    "severity",
-    "reserve_use",
-    "cause_confidence",
-    "paramotor_type",
-    "factor_accelerator",
-    "factor_trimmer_position",
-    "pilot_actions",
-    "factor_mid_air_collision",
-    "primary_cause",
-]
-
-
-def apply_filters(queryset, filters, exclude=False):
-    """Apply include or exclude filters to a queryset."""
-    for field, value in filters.items():
-        if field == "wind_speed_ms_min":
-            if not exclude:
-                queryset = queryset.filter(wind_speed_ms__gte=float(value))
-            else:
-                queryset = queryset.exclude(wind_speed_ms__gte=float(value))
-        elif field == "wind_speed_ms_max":
-            if not exclude:
-                queryset = queryset.filter(wind_speed_ms__lt=float(value))
-            else:
-                queryset = queryset.exclude(wind_speed_ms__lt=float(value))
-        elif field == "altitude_min":
-            if not exclude:
-                queryset = queryset.filter(flight_altitude__gte=int(value))
-            else:
-                queryset = queryset.exclude(flight_altitude__gte=int(value))
-        elif field == "altitude_max":
-            if not exclude:
-                queryset = queryset.filter(flight_altitude__lt=int(value))
-            else:
-                queryset = queryset.exclude(flight_altitude__lt=int(value))
-        elif field == "altitude_not_null":
-            if value is True or (isinstance(value, str) and value.lower() == "true"):
-                if not exclude:
-                    queryset = queryset.filter(flight_altitude__isnull=False)
-                else:
-                    queryset = queryset.exclude(flight_altitude__isnull=False)
-        elif field == "wind_speed_ms_not_null":
-            if value is True or (isinstance(value, str) and value.lower() == "true"):
-                if not exclude:
-                    queryset = queryset.filter(wind_speed_ms__isnull=False)
-                else:
-                    queryset = queryset.exclude(wind_speed_ms__isnull=False)
-        elif field == "year_min":
-            if not exclude:
-                queryset = queryset.filter(date__year__gte=int(value))
-            else:
-                queryset = queryset.exclude(date__year__gte=int(value))
-        elif field == "year_max":
-            if not exclude:
-                queryset = queryset.filter(date__year__lte=int(value))
-            else:
-                queryset = queryset.exclude(date__year__lte=int(value))
-        elif field in BOOLEAN_FILTER_FIELDS:
-            if value is True or (isinstance(value, str) and value.lower() == "true"):
-                if exclude:
-                    queryset = queryset.exclude(**{field: True})
-                else:
-                    queryset = queryset.filter(**{field: True})
-            elif value is False or (isinstance(value, str) and value.lower() == "false"):
-                if exclude:
-                    queryset = queryset.exclude(**{field: False})
-                else:
-                    queryset = queryset.filter(**{field: False})
-        elif field in CHOICE_FILTER_FIELDS:
-            if isinstance(value, list):
-                values = value
-            else:
-                values = [v.strip() for v in str(value).split(",")]
-            if "null" in values:
-                values = [v for v in values if v != "null"]
-                if exclude:
-                    queryset = queryset.exclude(**{f"{field}__isnull": True})
-                    if values:
-                        queryset = queryset.exclude(**{f"{field}__in": values})
-                else:
-                    if values:
-                        queryset = queryset.filter(Q(**{f"{field}__isnull": True}) | Q(**{f"{field}__in": values}))
-                    else:
-                        queryset = queryset.filter(**{f"{field}__isnull": True})
-            else:
-                if exclude:
-                    queryset = queryset.exclude(**{f"{field}__in": values})
-                else:
-                    queryset = queryset.filter(**{f"{field}__in": values})
-        elif field == "collapse":
-            if value is True or (isinstance(value, str) and value.lower() == "true"):
-                q = (
-                    Q(collapse_types__icontains="asymmetric_small") |
-                    Q(collapse_types__icontains="asymmetric_medium") |
-                    Q(collapse_types__icontains="asymmetric_large") |
-                    Q(collapse_types__icontains="frontal") |
-                    Q(collapse_types__icontains="unknown")
-                )
-                if exclude:
-                    queryset = queryset.exclude(q)
-                else:
-                    queryset = queryset.filter(q)
-        elif field == "stall":
-            if value is True or (isinstance(value, str) and value.lower() == "true"):
-                if exclude:
-                    queryset = queryset.exclude(collapse_types__icontains="full_stall")
-                else:
-                    queryset = queryset.filter(collapse_types__icontains="full_stall")
-        elif field == "spin":
-            if value is True or (isinstance(value, str) and value.lower() == "true"):
-                if exclude:
-                    queryset = queryset.exclude(collapse_types__icontains="spin")
-                else:
-                    queryset = queryset.filter(collapse_types__icontains="spin")
-        elif field == "line_twist":
-            if value is True or (isinstance(value, str) and value.lower() == "true"):
-                if exclude:
-                    queryset = queryset.exclude(collapse_types__icontains="line_twist")
-                else:
-                    queryset = queryset.filter(collapse_types__icontains="line_twist")
-        elif field == "unknown_collapse":
-            if value is True or (isinstance(value, str) and value.lower() == "true"):
-                if exclude:
-                    queryset = queryset.exclude(collapse_types__icontains="unknown")
-                else:
-                    queryset = queryset.filter(collapse_types__icontains="unknown")
-        elif field == "has_video":
-            if value is True or (isinstance(value, str) and value.lower() == "true"):
-                q = (
-                    Q(media_links__icontains="youtube") | Q(source_links__icontains="youtube") |
-                    Q(media_links__icontains="youtu.be") | Q(source_links__icontains="youtu.be")
-                )
-                if exclude:
-                    queryset = queryset.exclude(q)
-                else:
-                    queryset = queryset.filter(q)
-    return queryset
-
-
-class UnverifiedIncidentListView(generics.ListAPIView):
-    serializer_class = IncidentSerializer
+def apply_ordering(queryset, order_by):
+    """Order by an allowed order_by value; severity sorts by rank with unknown severity last."""
+    if not order_by or order_by not in ALLOWED_ORDER_BY_FIELDS_WITH_DESC:
+        return queryset
+    if order_by == "severity":
+        return queryset.order_by(F("severity_rank").asc(nulls_last=True), "date")
+    if order_by == "-severity":
+        return queryset.order_by(F("severity_rank").desc(nulls_last=True), "-date")
+    return queryset.order_by(order_by)
+
+
+def rank_by_ids(queryset, incident_ids):
+    """
+    Restrict queryset to incident_ids and order it by their position in the list.
+    The ids travel as JSON query parameters: json_each() restricts the rows and an
+    {id: position} object gives each row its sort key, so the queryset holds no
+    connection state and any number of rankings can coexist.
+    """
+    incident_ids = list(incident_ids)
+    positions = {str(incident_id): position for position, incident_id in enumerate(incident_ids)}
+    id_column = f'"{queryset.model._meta.db_table}"."id"'
+    position = RawSQL(f"""json_extract(%s, '$."' || {id_column} || '"')""", (json.dumps(positions),))
+    return queryset.filter(
+        id__in=RawSQL("SELECT value FROM json_each(%s)", (json.dumps(incident_ids),))
+    ).order_by(position.asc())
+
+
+class SparseFieldsMixin:
+    """
+    List views serialized with IncidentListSerializer.
+    A `fields=uuid,title,...` query param selects the returned fields; model columns
+    that are not needed are deferred.
+    """
+    serializer_class = IncidentListSerializer
+
+    def get_default_fields(self):
+        return LIST_FIELDS
+
+    def get_requested_fields(self):
+        fields = self.request.query_params.get("fields")
+        if not fields:
+            return self.get_default_fields()
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in self.serializer_class.available_fields()]
+        if unknown:
+            raise ValidationError({"fields": f"Unknown fields: {', '.join(unknown)}"})
+        return requested
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs["fields"] = self.get_requested_fields()
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = ["search_text" if f == "text_content" else f for f in self.get_requested_fields()]
+        columns = {f.name for f in Incident._meta.concrete_fields}
+        return queryset.only(*[f for f in fields if f in columns])
+
+
+class UnverifiedIncidentListView(SparseFieldsMixin, generics.ListAPIView):
+    pagination_class = UnverifiedIncidentPagination
 
     def get_queryset(self):
-        return Incident.all_objects.filter(verified=False).order_by("created_at")
+        return Incident.all_objects.filter(verified=False)
 
 
-class IncidentListView(generics.ListAPIView):
-    serializer_class = IncidentSerializer
+@method_decorator(condition(etag_func=incident_list_etag), name="get")
+class IncidentListView(SparseFieldsMixin, generics.ListAPIView):
     pagination_class = IncidentPagination
 
+    def get_default_fields(self):
+        # Search results highlight the matched fragment of text_content
+        if self.request.query_params.get("semantic_search") or self.request.query_params.get("text_search"):
+            return LIST_FIELDS + ["text_content"]
+        return LIST_FIELDS
+
     def get_queryset(self):
         semantic_search = self.request.query_params.get("semantic_search")
         text_search = self.request.query_params.get("text_search")
@@ -284,37 +171,16 @@ class IncidentListView(generics.ListAPIView):
             embedding = ai_communicator.get_embedding(semantic_search)
             results = search_similar(embedding, limit=100)
             incident_ids = [r[0] for r in results]
-            preserved_order = Case(*[When(id=id, then=pos) for pos, id in enumerate(incident_ids)])
-            queryset = Incident.objects.filter(id__in=incident_ids).order_by(preserved_order)
+            queryset = rank_by_ids(Incident.objects.all(), incident_ids)
         elif text_search:
-            incident_ids = search_fts(text_search, limit=100)
-            preserved_order = Case(*[When(id=id, then=pos) for pos, id in enumerate(incident_ids)])
-            queryset = Incident.objects.filter(id__in=incident_ids).order_by(preserved_order)
+            try:
+                incident_ids = search_fts(text_search, limit=100)
+            except ValueError as e:
+                raise ValidationError({"text_search": str(e)})
+            queryset = rank_by_ids(Incident.objects.all(), incident_ids)
         else:
             queryset = Incident.objects.all()
-            order_by = self.request.query_params.get("order_by")
-            if order_by and order_by in ALLOWED_ORDER_BY_FIELDS_WITH_DESC:
-                # Custom ordering for severity to respect severity levels
-                if order_by == "severity":
-                    queryset = queryset.order_by(
-                        Case(
-                            When(severity="minor", then=1),
-                            When(severity="serious", then=2),
-                            When(severity="fatal", then=3),
-                            default=4,  # Put null/unknown severity at the end
-                        )
-                    )
-                elif order_by == "-severity":
-                    queryset = queryset.order_by(
-                        Case(
-                            When(severity="fatal", then=1),
-                            When(severity="serious", then=2),
-                            When(severity="minor", then=3),
-                            default=4,  # Put null/unknown severity at the end
-                        )
-                    )
-                else:
-                    queryset = queryset.order_by(order_by)
+            queryset = apply_ordering(queryset, self.request.query_params.get("order_by"))
 
         # Collect include filters from query params
         include_filters = {}
@@ -381,6 +247,7 @@ class IncidentListView(generics.ListAPIView):
         return queryset
 
 
+@method_decorator(condition(etag_func=incident_etag), name="get")
 class IncidentDetailView(generics.RetrieveAPIView):
     serializer_class = IncidentSerializer
     lookup_field = "uuid"
@@ -416,12 +283,8 @@ class IncidentSaveView(APIView):
         serializer.is_valid(raise_exception=True)
         incident = serializer.save()
 
-        # Generate and store embedding
-        embedding = ai_communicator.get_embedding(incident.to_text())
-        upsert_embedding(incident.id, embedding)
-
-        # Update FTS index
-        upsert_fts(incident.id, incident.to_text())
+        # The embedding is refreshed only if the search text changed
+        refresh_search_index(incident)
 
         return Response({
             "incident": IncidentSerializer(incident).data,
@@ -444,12 +307,8 @@ class IncidentUpdateView(APIView):
         serializer.is_valid(raise_exception=True)
         incident = serializer.save()
 
-        # Regenerate and store embedding
-        embedding = ai_communicator.get_embedding(incident.to_text())
-        upsert_embedding(incident.id, embedding)
-
-        # Update FTS index
-        upsert_fts(incident.id, incident.to_text())
+        # The embedding is refreshed only if the search text changed
+        refresh_search_index(incident)
 
         return Response({
             "incident": IncidentSerializer(incident).data,
@@ -465,7 +324,6 @@ class IncidentDeleteView(APIView):
         incident_id = incident.id
         incident.delete()
         delete_embedding(incident_id)
-        delete_fts(incident_id)
         return Response({"deleted": True})
 
 
@@ -497,6 +355,29 @@ class IncidentSearchView(APIView):
         })
 
 
+class IncidentTextSearchView(APIView):
+    """
+    Ranked full-text search that returns highlighted fragments instead of full incidents.
+    Not response-cached: free-text queries almost never repeat, so caching them only churns the cache.
+    """
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError({"q": "This parameter is required"})
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            raise ValidationError({"limit": "Expected an integer"})
+        limit = max(1, min(limit, 100))
+
+        try:
+            results = search_fts_snippets(query, limit=limit)
+        except ValueError as e:
+            raise ValidationError({"q": str(e)})
+        return Response({"results": results})
+
+
 class IncidentDuplicatesView(APIView):
     def post(self, request):
         incident_data = request.data.get("incident_data", {})
@@ -574,30 +455,19 @@ class CheckDuplicateView(APIView):
             by_country_date = Incident.objects.filter(country=country, date=date)
             if exclude_id:
                 by_country_date = by_country_date.exclude(id=exclude_id)
-            medium_matches.update(by_country_date.values_list("id", flat=True))
+            medium_matches.update(by_country_date.order_by().values_list("id", flat=True))
         
         if country and pilot_name:
             by_country_pilot = Incident.objects.filter(country=country, pilot_name=pilot_name)
             if exclude_id:
                 by_country_pilot = by_country_pilot.exclude(id=exclude_id)
-            medium_matches.update(by_country_pilot.values_list("id", flat=True))
+            medium_matches.update(by_country_pilot.order_by().values_list("id", flat=True))
         
         # Check for matching links
-        links = []
-        source_links = incident_data.get("source_links", "")
-        media_links = incident_data.get("media_links", "")
-        
-        if source_links:
-            links.extend([link.strip() for link in source_links.split("\n") if link.strip()])
-        if media_links:
-            links.extend([link.strip() for link in media_links.split("\n") if link.strip()])
+        links = split_links(incident_data.get("source_links")) + split_links(incident_data.get("media_links"))
         
         if links:
-            link_query = Q()
-            for link in links:
-                link_query |= Q(source_links__icontains=link) | Q(media_links__icontains=link)
-            
-            by_links = Incident.objects.filter(link_query)
+            by_links = Incident.objects.filter(id__in=IncidentLink.matching(links).values("incident_id"))
             if exclude_id:
                 by_links = by_links.exclude(id=exclude_id)
             medium_matches.update(by_links.values_list("id", flat=True))
@@ -627,26 +497,45 @@ class CheckDuplicateView(APIView):
         })
 
 
+def count_filter_packs(filter_packs) -> dict:
+    """Count every filter pack in one scan: COUNT(...) FILTER (WHERE <pack predicate>) per pack."""
+    if not filter_packs:
+        return {}
+
+    aggregates = {}
+    for i, pack in enumerate(filter_packs):
+        q = (
+            build_filter_q(pack.get("include", {}), exclude=False) &
+            build_filter_q(pack.get("exclude", {}), exclude=True)
+        )
+        aggregates[f"pack_{i}"] = Count("id", filter=q) if q else Count("id")
+
+    counts = Incident.objects.aggregate(**aggregates)
+    return {pack["name"]: counts[f"pack_{i}"] for i, pack in enumerate(filter_packs)}
+
+
 class DashboardStatsView(APIView):
+    @cached_response
     def post(self, request):
         filter_packs = request.data.get("filter_packs", [])
+
+        # Right after a write the snapshot is stale and rebuilding it loads every incident;
+        # a single aggregate scan answers this request sooner, the other stats views rebuild it
+        snapshot = get_current_snapshot()
+        if snapshot is None:
+            return Response(count_filter_packs(filter_packs))
+
         results = {}
-        
+
         for pack in filter_packs:
-            name = pack["name"]
-            include_filters = pack.get("include", {})
-            exclude_filters = pack.get("exclude", {})
-            
-            queryset = Incident.objects.all()
-            queryset = apply_filters(queryset, include_filters, exclude=False)
-            queryset = apply_filters(queryset, exclude_filters, exclude=True)
-            
-            results[name] = queryset.count()
-        
+            mask = snapshot.filter_mask(pack.get("include", {}), pack.get("exclude", {}))
+            results[pack["name"]] = snapshot.count(mask)
+
         return Response(results)
 
 
 class CountriesView(APIView):
+    @cached_response
     def get(self, request):
         countries = (
             Incident.objects
@@ -661,46 +550,28 @@ class CountriesView(APIView):
 
 
 class CountryStatsView(APIView):
+    @cached_response
     def post(self, request):
         include_filters = request.data.get("include", {})
         exclude_filters = request.data.get("exclude", {})
         limit = request.data.get("limit", 10)
-        
-        queryset = Incident.objects.all()
-        queryset = apply_filters(queryset, include_filters, exclude=False)
-        queryset = apply_filters(queryset, exclude_filters, exclude=True)
-        
-        country_counts = (
-            queryset
-            .exclude(country__isnull=True)
-            .exclude(country="")
-            .values("country")
-            .annotate(count=Count("id"))
-            .order_by("-count")[:limit]
-        )
-        
-        return Response(list(country_counts))
+
+        snapshot = get_snapshot()
+        mask = snapshot.filter_mask(include_filters, exclude_filters)
+
+        return Response(snapshot.country_counts(mask, limit=limit))
 
 
 class YearStatsView(APIView):
+    @cached_response
     def post(self, request):
         include_filters = request.data.get("include", {})
         exclude_filters = request.data.get("exclude", {})
-        
-        queryset = Incident.objects.all()
-        queryset = apply_filters(queryset, include_filters, exclude=False)
-        queryset = apply_filters(queryset, exclude_filters, exclude=True)
-        
-        year_counts = (
-            queryset
-            .exclude(date__isnull=True)
-            .annotate(year=ExtractYear("date"))
-            .values("year")
-            .annotate(count=Count("id"))
-            .order_by("year")
-        )
-        
-        return Response(list(year_counts))
+
+        snapshot = get_snapshot()
+        mask = snapshot.filter_mask(include_filters, exclude_filters)
+
+        return Response(snapshot.year_counts(mask))
 
 
 class IncidentDraftsView(generics.ListAPIView):
@@ -712,39 +583,41 @@ class IncidentDraftsView(generics.ListAPIView):
 
 
 class WindSpeedPercentileView(APIView):
+    @cached_response
     def post(self, request):
         include_filters = request.data.get("include", {})
         exclude_filters = request.data.get("exclude", {})
-        percentile = request.data.get("percentile", 40)
-        
-        queryset = Incident.objects.all()
-        queryset = apply_filters(queryset, include_filters, exclude=False)
-        queryset = apply_filters(queryset, exclude_filters, exclude=True)
-        
-        wind_speeds = list(
-            queryset
-            .exclude(wind_speed_ms__isnull=True)
-            .values_list("wind_speed_ms", flat=True)
-            .order_by("wind_speed_ms")
-        )
-        
-        if not wind_speeds:
-            return Response({"percentile_value": None})
-        
-        index = int(len(wind_speeds) * percentile / 100)
-        percentile_value = wind_speeds[index] if index < len(wind_speeds) else wind_speeds[-1]
-        
-        return Response({"percentile_value": round(percentile_value, 1)})
+        percentiles = request.data.get("percentiles")
+        if percentiles is None:
+            percentiles = [request.data.get("percentile", 40)]
+        if not isinstance(percentiles, list) or not all(
+            isinstance(p, (int, float)) and not isinstance(p, bool) and 0 <= p <= 100 for p in percentiles
+        ):
+            raise ValidationError({"percentiles": "Expected numbers between 0 and 100"})
+
+        snapshot = get_snapshot()
+        mask = snapshot.filter_mask(include_filters, exclude_filters)
+        wind_speeds = snapshot.sorted_wind_speeds(mask)
+
+        values = []
+        for percentile in percentiles:
+            if not wind_speeds:
+                values.append(None)
+                continue
+            index = min(int(len(wind_speeds) * percentile / 100), len(wind_speeds) - 1)
+            values.append(round(wind_speeds[index], 1))
+
+        if "percentiles" in request.data:
+            return Response({"percentile_values": values})
+        return Response({"percentile_value": values[0]})
 
 
 class DateRangeView(APIView):
+    @cached_response
     def get(self, request):
-        date_range = Incident.objects.aggregate(
-            min_date=Min("date"),
-            max_date=Max("date")
-        )
-        
+        snapshot = get_snapshot()
+
         return Response({
-            "min_date": date_range["min_date"],
-            "max_date": date_range["max_date"]
+            "min_date": snapshot.min_date,
+            "max_date": snapshot.max_date
         })
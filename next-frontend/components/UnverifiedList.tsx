@@ -8,14 +8,28 @@ import { fetchUnverifiedIncidents } from '@/lib/api';
 function UnverifiedList() {
   const [incidents, setIncidents] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const getCursor = (nextUrl) => nextUrl ? new URL(nextUrl).searchParams.get('cursor') : null;
 
   useEffect(() => {
     fetchUnverifiedIncidents().then(data => {
-      setIncidents(data);
+      setIncidents(data.results);
+      setNextCursor(getCursor(data.next));
       setLoading(false);
     });
   }, []);
 
+  const loadMore = () => {
+    setLoadingMore(true);
+    fetchUnverifiedIncidents(nextCursor).then(data => {
+      setIncidents(prev => [...prev, ...data.results]);
+      setNextCursor(getCursor(data.next));
+      setLoadingMore(false);
+    });
+  };
+
   const formatDate = (dateStr) => {
     if (!dateStr) return '';
     const date = new Date(dateStr);
@@ -43,7 +57,7 @@ function UnverifiedList() {
         <div className="flex items-center gap-4 mb-6">
           <h1 className="font-display text-3xl text-gradient">Unverified Incidents</h1>
           <span className="px-3 py-1 bg-amber-500/20 text-amber-400 rounded-full text-sm font-medium">
-            {incidents.length} draft{incidents.length !== 1 ? 's' : ''}
+            {incidents.length}{nextCursor ? '+' : ''} draft{incidents.length !== 1 ? 's' : ''}
           </span>
         </div>
 
@@ -90,6 +104,15 @@ function UnverifiedList() {
                 </div>
               </Link>
             ))}
+            {nextCursor && (
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="w-full py-3 text-sm text-slate-400 border border-slate-700/50 rounded-xl hover:border-amber-500/50 hover:text-white transition-all disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            )}
           </div>
         )}
       </div>
@@ -171,8 +171,9 @@ export async function fetchDashboardStats(filterPacks: any[]) {
   return response.json();
 }
 
-export async function fetchUnverifiedIncidents() {
-  const response = await fetch(`${API_BASE}/incidents/unverified`, { cache: 'no-store' });
+export async function fetchUnverifiedIncidents(cursor: string | null = null) {
+  const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+  const response = await fetch(`${API_BASE}/incidents/unverified${params}`, { cache: 'no-store' });
   return response.json();
 }
 
@@ -6,10 +6,39 @@ import anthropic
 from openai import OpenAI
 
 from ppg_incidents.downloader import get_webpage_content
+from ppg_incidents.embedding_cache import get_cached_embedding, get_cached_embeddings, store_embedding, store_embeddings
 
 logger = getLogger(__name__)
 
 EMBEDDING_MODEL = "text-embedding-3-large"
+# text-embedding-3-large has 8192 token limit, truncate to ~7000 tokens (~28000 chars)
+EMBEDDING_MAX_CHARS = 28000
+# Embeddings endpoint accepts up to 2048 inputs and 300k tokens per request
+EMBEDDING_BATCH_MAX_INPUTS = 2048
+EMBEDDING_BATCH_TOKEN_BUDGET = 250000
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count for embedding input (~4 chars per token)."""
+    return len(text) // 4 + 1
+
+
+def split_embedding_batches(texts: list[str]) -> list[list[int]]:
+    """Split texts into batches of indices that fit the embeddings endpoint token budget."""
+    batches = []
+    current = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = _estimate_tokens(text[:EMBEDDING_MAX_CHARS])
+        if current and (current_tokens + tokens > EMBEDDING_BATCH_TOKEN_BUDGET or len(current) >= EMBEDDING_BATCH_MAX_INPUTS):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
 
 INCIDENT_CHAT_SYSTEM_PROMPT = """You are an assistant helping to document paramotor incidents. 
 Analyze the user's messages and extract incident details into a structured format.
@@ -140,16 +169,44 @@ class AiCommunicator:
             self.client_anthropic = anthropic.Anthropic(api_key=api_key_anthropic)
 
     def get_embedding(self, text: str) -> list[float]:
-        """Generate embedding for text using OpenAI text-embedding-3-large."""
-        # text-embedding-3-large has 8192 token limit, truncate to ~7000 tokens (~28000 chars)
-        max_chars = 28000
-        if len(text) > max_chars:
-            text = text[:max_chars]
+        """Generate embedding for text using OpenAI text-embedding-3-large, served from the persistent cache when possible."""
+        text = text[:EMBEDDING_MAX_CHARS]
+        cached = get_cached_embedding(EMBEDDING_MODEL, text)
+        if cached is not None:
+            return cached
         response = self.client.embeddings.create(
             model=EMBEDDING_MODEL,
             input=text
         )
-        return response.data[0].embedding
+        embedding = response.data[0].embedding
+        store_embedding(EMBEDDING_MODEL, text, embedding)
+        return embedding
+
+    def fetch_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """Request embeddings for texts from the API, chunked by token budget, without touching the cache or database."""
+        texts = [text[:EMBEDDING_MAX_CHARS] for text in texts]
+        embeddings = [None] * len(texts)
+        for batch in split_embedding_batches(texts):
+            response = self.client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=[texts[i] for i in batch]
+            )
+            for item in response.data:
+                embeddings[batch[item.index]] = item.embedding
+        return embeddings
+
+    def get_embeddings_batch(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for many texts, sending only cache misses to the API."""
+        texts = [text[:EMBEDDING_MAX_CHARS] for text in texts]
+        embeddings = get_cached_embeddings(EMBEDDING_MODEL, texts)
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            for i, embedding in zip(missing, self.fetch_embeddings([texts[i] for i in missing])):
+                embeddings[i] = embedding
+            store_embeddings(EMBEDDING_MODEL, [(texts[i], embeddings[i]) for i in missing])
+
+        return embeddings
 
     def send_request(self, prompt, model):
         if 'claude' in model:
@@ -0,0 +1,162 @@
+import hashlib
+import struct
+import time
+from logging import getLogger
+
+from django.db import connection, transaction
+
+logger = getLogger(__name__)
+
+MAX_ENTRIES = 20000
+# Eviction only needs a coarse recency order; refreshing a hit more often than this is a wasted write
+TOUCH_INTERVAL = 3600
+LOOKUP_CHUNK_SIZE = 500
+
+_stats = {"hits": 0, "misses": 0}
+_table_initialized = False
+
+
+def _get_raw_connection():
+    """Get Django's sqlite3 connection."""
+    connection.ensure_connection()
+    return connection.connection
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def init_embedding_cache_table():
+    """Initialize the embedding_cache table."""
+    conn = _get_raw_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            model TEXT NOT NULL,
+            text_hash TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            last_used_at REAL NOT NULL,
+            PRIMARY KEY (model, text_hash)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS embedding_cache_last_used_at
+        ON embedding_cache (last_used_at)
+    """)
+    conn.commit()
+    logger.info("Embedding cache table initialized")
+
+
+def _ensure_table():
+    global _table_initialized
+    if not _table_initialized:
+        init_embedding_cache_table()
+        _table_initialized = True
+
+
+def get_cached_embedding(model: str, text: str) -> list[float] | None:
+    """Return cached embedding for (model, text) or None."""
+    return get_cached_embeddings(model, [text])[0]
+
+
+def get_cached_embeddings(model: str, texts: list[str]) -> list[list[float] | None]:
+    """
+    Return cached embeddings for many texts of a model, None for misses.
+    Hits whose LRU timestamp is older than TOUCH_INTERVAL are refreshed with one UPDATE per chunk,
+    so hot entries are served without writing to the database at all.
+    """
+    _ensure_table()
+    conn = _get_raw_connection()
+    hashes = [_text_hash(text) for text in texts]
+    now = time.time()
+
+    rows = {}
+    stale = []
+    cursor = conn.cursor()
+    for start in range(0, len(hashes), LOOKUP_CHUNK_SIZE):
+        chunk = list(set(hashes[start:start + LOOKUP_CHUNK_SIZE]))
+        placeholders = ", ".join("?" * len(chunk))
+        cursor.execute(
+            f"SELECT text_hash, embedding, last_used_at FROM embedding_cache "
+            f"WHERE model = ? AND text_hash IN ({placeholders})",
+            (model, *chunk)
+        )
+        for text_hash, blob, last_used_at in cursor.fetchall():
+            rows[text_hash] = blob
+            if now - last_used_at > TOUCH_INTERVAL:
+                stale.append(text_hash)
+
+    if stale:
+        with transaction.atomic():
+            cursor = conn.cursor()
+            for start in range(0, len(stale), LOOKUP_CHUNK_SIZE):
+                chunk = stale[start:start + LOOKUP_CHUNK_SIZE]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(
+                    f"UPDATE embedding_cache SET last_used_at = ? WHERE model = ? AND text_hash IN ({placeholders})",
+                    (now, model, *chunk)
+                )
+
+    embeddings = []
+    for text_hash in hashes:
+        blob = rows.get(text_hash)
+        if blob is None:
+            _stats["misses"] += 1
+            embeddings.append(None)
+        else:
+            _stats["hits"] += 1
+            embeddings.append(list(struct.unpack(f"{len(blob) // 4}f", blob)))
+    return embeddings
+
+
+def store_embedding(model: str, text: str, embedding: list[float]):
+    """Store embedding for (model, text), evicting least recently used entries above MAX_ENTRIES."""
+    store_embeddings(model, [(text, embedding)])
+
+
+def store_embeddings(model: str, items: list[tuple[str, list[float]]]):
+    """Store many (text, embedding) pairs for a model in one transaction."""
+    _ensure_table()
+    conn = _get_raw_connection()
+    now = time.time()
+
+    with transaction.atomic():
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT OR REPLACE INTO embedding_cache (model, text_hash, embedding, last_used_at) VALUES (?, ?, ?, ?)",
+            [
+                (model, _text_hash(text), struct.pack(f"{len(embedding)}f", *embedding), now)
+                for text, embedding in items
+            ]
+        )
+        cursor.execute("""
+            DELETE FROM embedding_cache WHERE rowid IN (
+                SELECT rowid FROM embedding_cache
+                ORDER BY last_used_at DESC
+                LIMIT -1 OFFSET ?
+            )
+        """, (MAX_ENTRIES,))
+
+
+def clear_embedding_cache():
+    """Delete all cached embeddings and reset counters."""
+    _ensure_table()
+    conn = _get_raw_connection()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM embedding_cache")
+    conn.commit()
+    _stats["hits"] = 0
+    _stats["misses"] = 0
+
+
+def get_cache_stats() -> dict:
+    """Get hit/miss counters for this process and the number of cached entries."""
+    _ensure_table()
+    conn = _get_raw_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM embedding_cache")
+    return {
+        "hits": _stats["hits"],
+        "misses": _stats["misses"],
+        "size": cursor.fetchone()[0],
+    }
@@ -0,0 +1,181 @@
+"""
+Compile user text_search queries into FTS5 MATCH expressions.
+
+Syntax:
+- `reserve tangled` - all terms must match (implicit AND)
+- `reserve OR rescue`, `collapse NOT tree`, `(a OR b) AND c` - operators are uppercase only
+- `"line twist"` - phrase
+- `tang*` - prefix term
+- `title:reserve`, `causes:(wind OR gust)` - restrict to a column
+
+Every term is emitted as a quoted FTS5 string, so user input can never reach FTS5 as syntax.
+The trigram tokenizer matches substrings and cannot match anything shorter than 3 characters;
+such terms are dropped instead of making the whole query match nothing.
+"""
+import re
+
+MAX_QUERY_LENGTH = 1000
+MAX_TERMS = 16
+MAX_DEPTH = 4
+MIN_TERM_LENGTH = 3
+
+COLUMN_ALIASES = {
+    "title": "title",
+    "summary": "summary",
+    "description": "description",
+    "causes": "causes_description",
+    "causes_description": "causes_description",
+    "report": "report_raw",
+    "report_raw": "report_raw",
+}
+
+OPERATORS = ("AND", "OR", "NOT")
+
+_TOKEN_RE = re.compile(r'\s*(?:(?P<paren>[()])|"(?P<phrase>[^"]*)"?|(?P<word>[^\s()"]+))')
+
+
+def _tokenize(query: str) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+    query = query.rstrip()
+    while position < len(query):
+        match = _TOKEN_RE.match(query, position)
+        position = match.end()
+        if match["paren"]:
+            tokens.append(("paren", match["paren"]))
+        elif match["phrase"] is not None:
+            tokens.append(("term", match["phrase"]))
+        elif match["word"] in OPERATORS:
+            tokens.append(("op", match["word"]))
+        else:
+            word = match["word"]
+            column, colon, rest = word.partition(":")
+            if colon and column.lower() in COLUMN_ALIASES:
+                tokens.append(("column", COLUMN_ALIASES[column.lower()]))
+                if rest:
+                    tokens.append(("term", rest))
+            else:
+                tokens.append(("term", word))
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent over FTS5 precedence (NOT binds tighter than AND, AND tighter than OR).
+    Each method returns the compiled expression, or None if all of its terms were too short.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+        self.terms = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def parse(self):
+        expression = self.or_expr(depth=0, in_column=False)
+        if self.position < len(self.tokens):
+            raise ValueError("Unbalanced parentheses")
+        return expression
+
+    def or_expr(self, depth, in_column):
+        parts = [self.and_expr(depth, in_column)]
+        while self.peek() == ("op", "OR"):
+            self.take()
+            parts.append(self.and_expr(depth, in_column))
+        return _join(parts, "OR")
+
+    def and_expr(self, depth, in_column):
+        parts = []
+        parts.append(self.not_expr(depth, in_column, parts))
+        while True:
+            kind, value = self.peek()
+            if (kind, value) == ("op", "AND"):
+                self.take()
+            elif kind not in ("term", "column") and (kind, value) != ("paren", "("):
+                break
+            parts.append(self.not_expr(depth, in_column, parts))
+        return _join(parts, "AND")
+
+    def not_expr(self, depth, in_column, preceding):
+        """
+        If the left operand of NOT was dropped as too short, the exclusion applies to the
+        preceding AND operands instead (`reserve ab NOT tree` excludes tree from reserve),
+        so a dropped term never silently widens the results.
+        """
+        expression = self.primary(depth, in_column)
+        while self.peek() == ("op", "NOT"):
+            self.take()
+            excluded = self.primary(depth, in_column)
+            if excluded is None:
+                continue
+            if expression is None:
+                expression = _join(preceding, "AND")
+                preceding.clear()
+                if expression is None:
+                    raise ValueError(f"NOT needs a search term of at least {MIN_TERM_LENGTH} characters before it")
+            expression = f"({expression} NOT {excluded})"
+        return expression
+
+    def primary(self, depth, in_column):
+        kind, value = self.take()
+        if kind == "term":
+            return self.term(value)
+        if kind == "column":
+            if in_column:
+                raise ValueError("Column filters cannot be nested")
+            expression = self.primary(depth, in_column=True)
+            return None if expression is None else f"{{{value}}} : {expression}"
+        if (kind, value) == ("paren", "("):
+            if depth >= MAX_DEPTH:
+                raise ValueError(f"Too many nested parentheses (max {MAX_DEPTH})")
+            expression = self.or_expr(depth + 1, in_column)
+            if self.take() != ("paren", ")"):
+                raise ValueError("Unbalanced parentheses")
+            return None if expression is None else f"({expression})"
+        if kind is None:
+            raise ValueError("Query ends with an operator")
+        raise ValueError(f"Unexpected '{value}'")
+
+    def term(self, text):
+        self.terms += 1
+        if self.terms > MAX_TERMS:
+            raise ValueError(f"Too many search terms (max {MAX_TERMS})")
+        prefix = text.endswith("*")
+        text = text.rstrip("*")
+        if len(text.strip()) < MIN_TERM_LENGTH:
+            return None
+        return '"' + text.replace('"', '""') + '"' + ("*" if prefix else "")
+
+
+def _join(parts, operator):
+    parts = [part for part in parts if part is not None]
+    if not parts:
+        return None
+    if len(parts) == 1:
+        return parts[0]
+    return "(" + f" {operator} ".join(parts) + ")"
+
+
+def compile_query(query: str) -> str:
+    """
+    Compile a text_search query into an FTS5 MATCH expression.
+    Raises ValueError if the query is malformed, too complex or has no searchable term.
+    """
+    if len(query) > MAX_QUERY_LENGTH:
+        raise ValueError(f"Query is too long (max {MAX_QUERY_LENGTH} characters)")
+
+    tokens = _tokenize(query)
+    if not tokens:
+        raise ValueError("Query is empty")
+
+    expression = _Parser(tokens).parse()
+    if expression is None:
+        raise ValueError(f"Search terms need at least {MIN_TERM_LENGTH} characters")
+    return expression
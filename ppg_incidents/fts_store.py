@@ -1,6 +1,10 @@
+import html
+import uuid
 from logging import getLogger
 
-from django.db import connection
+from django.db import connection, transaction
+
+from ppg_incidents.fts_query import compile_query
 
 logger = getLogger(__name__)
 
@@ -11,73 +15,177 @@ def _get_raw_connection():
     return connection.connection
 
 
-def init_fts_table():
-    """Initialize the FTS5 virtual table with trigram tokenizer."""
-    conn = _get_raw_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE VIRTUAL TABLE IF NOT EXISTS fts_incidents USING fts5(
-            incident_id,
-            content,
-            tokenize='trigram'
-        )
-    """)
-    conn.commit()
-    logger.info("FTS table fts_incidents initialized")
+# fts_incidents is an external-content table over incidents_incident: it stores only the index,
+# reads text from the incident row, and is kept in sync by triggers on the incident table.
+# Each indexed column has a bm25 weight; search_extra (to_text() without those columns) catches the
+# rest, so no field is indexed, stored in the trigram index or counted by bm25 twice.
+FTS_COLUMN_WEIGHTS = {
+    "title": 10.0,
+    "summary": 5.0,
+    "description": 2.0,
+    "causes_description": 2.0,
+    "report_raw": 1.0,
+    "search_extra": 1.0,
+}
+FTS_COLUMNS = list(FTS_COLUMN_WEIGHTS)
+
+_columns = ", ".join(FTS_COLUMNS)
+_new_values = ", ".join(f"new.{column}" for column in FTS_COLUMNS)
+_old_values = ", ".join(f"old.{column}" for column in FTS_COLUMNS)
+
+FTS_TABLE_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS fts_incidents USING fts5(
+        {_columns},
+        content='incidents_incident',
+        content_rowid='id',
+        tokenize='trigram'
+    )
+"""
+
+FTS_TRIGGER_NAMES = ["fts_incidents_ai", "fts_incidents_ad", "fts_incidents_au"]
+
+FTS_TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS fts_incidents_ai AFTER INSERT ON incidents_incident BEGIN
+        INSERT INTO fts_incidents (rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS fts_incidents_ad AFTER DELETE ON incidents_incident BEGIN
+        INSERT INTO fts_incidents (fts_incidents, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS fts_incidents_au AFTER UPDATE OF {_columns} ON incidents_incident BEGIN
+        INSERT INTO fts_incidents (fts_incidents, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO fts_incidents (rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+]
+
+_BM25 = f"bm25(fts_incidents, {', '.join(str(weight) for weight in FTS_COLUMN_WEIGHTS.values())})"
+
+# snippet()/highlight() wrap matches in these control characters; the text is HTML-escaped
+# before they are replaced with <mark> tags, so stored text can never inject markup
+_MATCH_START = "\x02"
+_MATCH_END = "\x03"
 
 
-def upsert_fts(incident_id: int, content: str):
-    """Insert or update FTS content for an incident."""
+def init_fts_table():
+    """
+    Create the external-content FTS5 table (trigram tokenizer) and its sync triggers if missing.
+    SQLite drops the triggers whenever a migration remakes incidents_incident (AlterField,
+    RemoveField, ...); if any had to be re-created, writes made without them are missing
+    from the index, so it is rebuilt.
+    """
     conn = _get_raw_connection()
     cursor = conn.cursor()
-
-    # Delete existing entry if present
-    cursor.execute("DELETE FROM fts_incidents WHERE incident_id = ?", (str(incident_id),))
-
-    # Insert new content (lowercased)
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'fts_incidents'")
+    table_existed = cursor.fetchone() is not None
     cursor.execute(
-        "INSERT INTO fts_incidents (incident_id, content) VALUES (?, ?)",
-        (str(incident_id), content.lower())
+        f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({', '.join('?' * len(FTS_TRIGGER_NAMES))})",
+        FTS_TRIGGER_NAMES,
     )
+    triggers_missing = cursor.fetchone()[0] < len(FTS_TRIGGER_NAMES)
+
+    cursor.execute(FTS_TABLE_SQL)
+    for sql in FTS_TRIGGERS_SQL:
+        cursor.execute(sql)
     conn.commit()
-    logger.info(f"Stored FTS content for incident {incident_id}")
+    logger.info("FTS table fts_incidents initialized")
+
+    if table_existed and triggers_missing:
+        logger.warning("FTS sync triggers were missing, rebuilding fts_incidents")
+        rebuild_fts()
 
 
-def delete_fts(incident_id: int):
-    """Delete FTS content for an incident."""
+def rebuild_fts() -> int:
+    """
+    Rebuild the whole FTS index from the indexed columns of all incidents.
+    The rebuild runs in one transaction, so searches keep using the old index until it commits.
+    Returns number of indexed incidents.
+    """
     conn = _get_raw_connection()
     cursor = conn.cursor()
-    cursor.execute("DELETE FROM fts_incidents WHERE incident_id = ?", (str(incident_id),))
-    conn.commit()
+
+    with transaction.atomic():
+        cursor.execute("INSERT INTO fts_incidents (fts_incidents) VALUES ('rebuild')")
+        cursor.execute("INSERT INTO fts_incidents (fts_incidents) VALUES ('optimize')")
+    total = len(get_indexed_incident_ids())
+    logger.info(f"Rebuilt FTS index with {total} incidents")
+    return total
 
 
 def get_indexed_incident_ids() -> set[int]:
     """Get set of incident IDs that have FTS content."""
     conn = _get_raw_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT incident_id FROM fts_incidents")
-    return {int(row[0]) for row in cursor.fetchall()}
+    # Reading rowids from fts_incidents itself would list the content table; docsize has one row per indexed document
+    cursor.execute("SELECT id FROM fts_incidents_docsize")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _marked_html(text: str | None) -> str:
+    return html.escape(text or "").replace(_MATCH_START, "<mark>").replace(_MATCH_END, "</mark>")
 
 
 def search_fts(query: str, limit: int = 100) -> list[int]:
     """
-    Search for incidents by text.
-    Returns list of incident IDs ranked by relevance.
+    Search for incidents by text (see fts_query for the query syntax).
+    Returns list of incident IDs ranked by weighted relevance.
+    Raises ValueError for a query that does not compile.
     """
     conn = _get_raw_connection()
     cursor = conn.cursor()
 
-    # Lowercase and wrap in quotes to escape special chars like colons
-    query_escaped = '"' + query.lower().replace('"', '""') + '"'
-
-    cursor.execute("""
-        SELECT incident_id, bm25(fts_incidents)
+    cursor.execute(f"""
+        SELECT rowid
         FROM fts_incidents
-        WHERE content MATCH ?
-        ORDER BY bm25(fts_incidents)
+        WHERE fts_incidents MATCH ?
+        ORDER BY {_BM25}
         LIMIT ?
-    """, (query_escaped, limit))
+    """, (compile_query(query), limit))
+
+    return [row[0] for row in cursor.fetchall()]
 
-    results = cursor.fetchall()
-    return [int(row[0]) for row in results]
 
+def search_fts_snippets(query: str, limit: int = 20, snippet_tokens: int = 64) -> list[dict]:
+    """
+    Search verified incidents by text and return what a result list needs in one query:
+    incident fields, the title with matches highlighted, the best matching fragment across
+    all indexed columns and the weighted bm25 score (higher is more relevant).
+    Raises ValueError for a query that does not compile.
+    Highlighted text is HTML-escaped with matches wrapped in <mark>. Snippet length is counted
+    in trigram tokens, so snippet_tokens is roughly a number of characters (FTS5 caps it at 64).
+    """
+    conn = _get_raw_connection()
+    cursor = conn.cursor()
+
+    cursor.execute(f"""
+        SELECT i.uuid, i.date, i.country, i.severity,
+               highlight(fts_incidents, 0, ?, ?),
+               snippet(fts_incidents, -1, ?, ?, '…', ?),
+               {_BM25}
+        FROM fts_incidents
+        JOIN incidents_incident i ON i.id = fts_incidents.rowid
+        WHERE fts_incidents MATCH ? AND i.verified
+        ORDER BY {_BM25}
+        LIMIT ?
+    """, (
+        _MATCH_START, _MATCH_END,
+        _MATCH_START, _MATCH_END, snippet_tokens,
+        compile_query(query), limit,
+    ))
+
+    return [
+        {
+            "uuid": str(uuid.UUID(row[0])),
+            "date": row[1],
+            "country": row[2],
+            "severity": row[3],
+            "title": _marked_html(row[4]),
+            "snippet": _marked_html(row[5]),
+            "score": -row[6],
+        }
+        for row in cursor.fetchall()
+    ]
@@ -100,6 +100,16 @@ DATABASES = {
     }
 }
 
+# Cache
+# Stats responses are cached per process and keyed by data version (see incidents/response_cache.py)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
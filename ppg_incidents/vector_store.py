@@ -1,8 +1,7 @@
 import struct
 from logging import getLogger
 
-import sqlite_vec
-from django.db import connection
+from django.db import connection, transaction
 
 logger = getLogger(__name__)
 
@@ -10,13 +9,9 @@ EMBEDDING_DIM = 3072  # text-embedding-3-large output dimension
 
 
 def _get_raw_connection():
-    """Get Django's sqlite3 connection with sqlite-vec extension loaded."""
+    """Get Django's sqlite3 connection (sqlite-vec is loaded by the connection_created handler)."""
     connection.ensure_connection()
-    conn = connection.connection
-    conn.enable_load_extension(True)
-    sqlite_vec.load(conn)
-    conn.enable_load_extension(False)
-    return conn
+    return connection.connection
 
 
 def _serialize_embedding(embedding: list[float]) -> bytes:
@@ -56,6 +51,23 @@ def upsert_embedding(incident_id: int, embedding: list[float]):
     logger.info(f"Stored embedding for incident {incident_id}")
 
 
+def upsert_embeddings(items: list[tuple[int, list[float]]]):
+    """Insert or update embeddings for many incidents in a single transaction."""
+    conn = _get_raw_connection()
+
+    with transaction.atomic():
+        cursor = conn.cursor()
+        cursor.executemany(
+            "DELETE FROM vec_incidents WHERE incident_id = ?",
+            [(incident_id,) for incident_id, _ in items]
+        )
+        cursor.executemany(
+            "INSERT INTO vec_incidents (incident_id, embedding) VALUES (?, ?)",
+            [(incident_id, _serialize_embedding(embedding)) for incident_id, embedding in items]
+        )
+    logger.info(f"Stored {len(items)} embeddings")
+
+
 def delete_embedding(incident_id: int):
     """Delete embedding for an incident."""
     conn = _get_raw_connection()
@@ -1,6 +1,7 @@
 import pytest
+from django.core.cache import cache
 
-import ppg_incidents.vector_store as vector_store
+import ppg_incidents.embedding_cache as embedding_cache
 from ppg_incidents.fts_store import init_fts_table, _get_raw_connection as fts_get_conn
 from ppg_incidents.vector_store import init_vector_table, _get_raw_connection as vec_get_conn
 
@@ -11,14 +12,17 @@ def setup_virtual_tables(db):
     
     Incident.all_objects.all().delete()
     
-    vector_store._vec_loaded = False
+    embedding_cache._table_initialized = False
     init_vector_table()
     init_fts_table()
     
     conn = fts_get_conn()
-    conn.execute("DELETE FROM fts_incidents")
+    conn.execute("INSERT INTO fts_incidents (fts_incidents) VALUES ('rebuild')")
     conn.commit()
     
     conn = vec_get_conn()
     conn.execute("DELETE FROM vec_incidents")
     conn.commit()
+    
+    embedding_cache.clear_embedding_cache()
+    cache.clear()
@@ -0,0 +1,65 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ppg_incidents.ai_communication import EMBEDDING_MODEL, ai_communicator
+from django.db import connection
+
+from ppg_incidents import embedding_cache
+from ppg_incidents.embedding_cache import get_cache_stats, get_cached_embeddings, store_embeddings
+
+
+@pytest.mark.django_db
+def test_get_embedding_uses_cache():
+    response = MagicMock()
+    response.data = [MagicMock(embedding=[0.5, 0.25, 0.125])]
+
+    with patch.object(ai_communicator, "client") as client:
+        client.embeddings.create.return_value = response
+
+        first = ai_communicator.get_embedding("wing collapse near Valencia")
+        second = ai_communicator.get_embedding("wing collapse near Valencia")
+        ai_communicator.get_embedding("engine failure in France")
+
+    assert first == second == [0.5, 0.25, 0.125]
+    assert client.embeddings.create.call_count == 2
+
+    stats = get_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["size"] == 2
+
+
+@pytest.mark.django_db
+def test_get_cached_embeddings_touches_only_stale_hits():
+    store_embeddings("model", [("fresh", [1.0]), ("stale", [2.0])])
+    with connection.cursor() as cursor:
+        cursor.execute("UPDATE embedding_cache SET last_used_at = 0")
+    stale_hash = embedding_cache._text_hash("stale")
+
+    assert get_cached_embeddings("model", ["stale", "missing", "stale"]) == [[2.0], None, [2.0]]
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT text_hash, last_used_at FROM embedding_cache")
+        last_used = dict(cursor.fetchall())
+    assert last_used[stale_hash] > 0
+    assert last_used[embedding_cache._text_hash("fresh")] == 0
+
+    with patch.object(embedding_cache.transaction, "atomic") as atomic:
+        assert get_cached_embeddings("model", ["stale"]) == [[2.0]]
+    atomic.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_get_embeddings_batch_requests_only_cache_misses():
+    store_embeddings(EMBEDDING_MODEL, [("reserve deployed", [1.0])])
+    response = MagicMock()
+    response.data = [MagicMock(index=0, embedding=[2.0])]
+
+    with patch.object(ai_communicator, "client") as client:
+        client.embeddings.create.return_value = response
+        embeddings = ai_communicator.get_embeddings_batch(["reserve deployed", "tree landing"])
+
+    assert embeddings == [[1.0], [2.0]]
+    client.embeddings.create.assert_called_once_with(model=EMBEDDING_MODEL, input=["tree landing"])
+    assert get_cached_embeddings(EMBEDDING_MODEL, ["tree landing"]) == [[2.0]]
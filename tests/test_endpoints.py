@@ -1,11 +1,22 @@
+import base64
+import csv
+import io
+import json
 from unittest.mock import patch
 
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection, models
 from rest_framework.test import APIClient
 
-from incidents.models import Incident
-from ppg_incidents.fts_store import upsert_fts, search_fts
+from incidents.models import DataVersion, Incident
+from incidents.search_index import refresh_search_index
+from incidents.snapshot import get_snapshot
+from incidents.views import rank_by_ids
+from ppg_incidents.fts_store import get_indexed_incident_ids, search_fts
 
 
 @pytest.mark.django_db
@@ -29,10 +40,6 @@ def test_full_text_search():
         verified=True,
     )
 
-    upsert_fts(incident1.id, "wing collapse asymmetric deflation spain valencia")
-    upsert_fts(incident2.id, "engine failure france motor stopped")
-    upsert_fts(incident3.id, "paramotor crash germany fatal accident")
-
     results = search_fts("collapse")
     assert incident1.id in results
     assert incident2.id not in results
@@ -79,6 +86,7 @@ def test_incidents_endpoints():
     assert data["title"] == "Engine failure"
     assert data["country"] == "France"
     assert data["severity"] == "minor"
+    assert "severity_rank" not in data
 
 
 @pytest.mark.django_db
@@ -112,7 +120,7 @@ def test_incident_chat_flow():
     assert data["incident_data"]["title"] == "Wing collapse near Valencia"
     assert data["saved"] is False
 
-    with patch("incidents.views.upsert_embedding"), patch("incidents.views.upsert_fts"), \
+    with patch("incidents.search_index.upsert_embedding"), \
          patch("incidents.views.ai_communicator.get_embedding", return_value=[0.1] * 1536):
         response = client.post(
             "/api/incident/save",
@@ -152,3 +160,536 @@ def test_non_admin_cannot_delete_incident():
     response = client.delete(f"/api/incident/{incident.uuid}/delete")
     assert response.status_code == 200
     assert response.json()["deleted"] is True
+
+
+@pytest.mark.django_db
+def test_dashboard_stats_counts_all_packs():
+    client = APIClient()
+
+    Incident.objects.create(title="A", severity="fatal", factor_low_altitude=True, verified=True)
+    Incident.objects.create(title="B", severity="fatal", factor_low_altitude=False, verified=True)
+    Incident.objects.create(title="C", severity="minor", verified=True)
+    Incident.objects.create(title="D", severity="fatal", verified=False)
+
+    filter_packs = [
+        {"name": "total"},
+        {"name": "fatal", "include": {"severity": "fatal"}},
+        {"name": "fatal_not_low", "include": {"severity": "fatal"}, "exclude": {"factor_low_altitude": True}},
+        {"name": "unknown_or_minor", "include": {"severity": ["null", "minor"]}},
+    ]
+    expected = {"total": 3, "fatal": 2, "fatal_not_low": 1, "unknown_or_minor": 1}
+
+    # Stale snapshot: answered by one aggregate query
+    with patch("incidents.views.get_snapshot") as snapshot:
+        response = client.post("/api/dashboard_stats", data={"filter_packs": filter_packs}, format="json")
+        assert snapshot.call_count == 0
+    assert response.status_code == 200
+    assert response.json() == expected
+
+    # Warm snapshot: answered from its bitmasks, with the same counts
+    get_snapshot()
+    cache.clear()
+    response = client.post("/api/dashboard_stats", data={"filter_packs": filter_packs}, format="json")
+    assert response.json() == expected
+
+
+@pytest.mark.django_db
+def test_incident_list_factor_filters():
+    client = APIClient()
+
+    match = Incident.objects.create(title="Match", factor_low_altitude=True, factor_rain=False, verified=True)
+    Incident.objects.create(title="Rain", factor_low_altitude=True, factor_rain=True, verified=True)
+    Incident.objects.create(title="High", factor_low_altitude=False, verified=True)
+    unknown_rain = Incident.objects.create(title="Unknown rain", factor_low_altitude=True, verified=True)
+
+    response = client.get("/api/incidents?factor_low_altitude=true&exclude_factor_rain=true")
+    assert response.status_code == 200
+    uuids = {r["uuid"] for r in response.json()["results"]}
+    assert uuids == {str(match.uuid), str(unknown_rain.uuid)}
+
+    response = client.get("/api/incidents?factor_low_altitude=true&factor_rain=false")
+    uuids = {r["uuid"] for r in response.json()["results"]}
+    assert uuids == {str(match.uuid)}
+
+    # Writes that skip save() are filtered correctly too
+    Incident.all_objects.filter(pk=match.pk).update(factor_rain=True)
+    response = client.get("/api/incidents?factor_low_altitude=true&factor_rain=false")
+    assert response.json()["results"] == []
+
+
+@pytest.mark.django_db
+def test_incident_list_collapse_filters():
+    client = APIClient()
+
+    spin = Incident.objects.create(title="Spin", collapse_types=["asymmetric_large", "spin"], verified=True)
+    collapse = Incident.objects.create(title="Collapse", collapse_types=["frontal"], verified=True)
+    none = Incident.objects.create(title="None", verified=True)
+
+    response = client.get("/api/incidents?spin=true")
+    assert {r["uuid"] for r in response.json()["results"]} == {str(spin.uuid)}
+
+    response = client.get("/api/incidents?exclude_collapse=true")
+    assert {r["uuid"] for r in response.json()["results"]} == {str(none.uuid)}
+
+    collapse.collapse_types = ["line_twist"]
+    collapse.save()
+    response = client.get("/api/incidents?line_twist=true")
+    assert {r["uuid"] for r in response.json()["results"]} == {str(collapse.uuid)}
+
+
+@pytest.mark.django_db
+def test_check_duplicate_by_link():
+    client = APIClient()
+
+    incident = Incident.objects.create(
+        title="Video incident",
+        source_links="https://www.usppa.org/incidents/entry/123/\nhttps://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        verified=True,
+    )
+
+    for links in ["http://usppa.org/incidents/entry/123", "https://youtu.be/dQw4w9WgXcQ?si=share"]:
+        response = client.post(
+            "/api/incident/check_duplicate",
+            data={"incident_data": {"media_links": links}},
+            format="json",
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["confidence"] == "Medium"
+        assert [i["uuid"] for i in data["incidents"]] == [str(incident.uuid)]
+
+    response = client.get("/api/incidents?has_video=true")
+    assert [r["uuid"] for r in response.json()["results"]] == [str(incident.uuid)]
+
+
+@pytest.mark.django_db
+def test_csv_export_streams_rows():
+    client = APIClient()
+
+    Incident.objects.create(
+        title="Exported", date="2024-05-01", severity="fatal", hardware_failure=False,
+        collapse_types=["frontal", "spin"], factor_rain=True, verified=True,
+    )
+
+    response = client.get("/api/incidents/csv")
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Disposition"] == 'attachment; filename="incidents.csv"'
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+    assert len(rows) == 1
+    row = rows[0]
+    assert row["Title"] == "Exported"
+    assert row["Date"] == "2024-05-01"
+    assert row["Severity"] == "Fatal"
+    assert row["Hardware Failure"] == "No"
+    assert row["Potentially Fatal"] == ""
+    assert row["Collapse Types"] == "frontal, spin"
+    assert row["Factor Rain"] == "Yes"
+    assert row["Factor Fire"] == ""
+
+
+@pytest.mark.django_db
+def test_incident_list_sparse_fields():
+    client = APIClient()
+
+    incident = Incident.objects.create(title="Slim", country="Spain", description="Long text", verified=True)
+    Incident.objects.create(title="Draft", verified=False)
+
+    response = client.get("/api/incidents")
+    result = response.json()["results"][0]
+    assert result["uuid"] == str(incident.uuid)
+    assert "text_content" not in result
+    assert "description" not in result
+
+    response = client.get("/api/incidents?fields=uuid,title,description")
+    assert response.json()["results"] == [{"uuid": str(incident.uuid), "title": "Slim", "description": "Long text"}]
+
+    response = client.get("/api/incidents?fields=uuid,text_content")
+    assert "Slim" in response.json()["results"][0]["text_content"]
+
+    response = client.get("/api/incidents/unverified?fields=title")
+    assert response.json()["results"] == [{"title": "Draft"}]
+
+    response = client.get("/api/incidents?fields=uuid,foo,search_hash,severity_rank")
+    assert response.status_code == 400
+    assert response.json() == {"fields": "Unknown fields: foo, search_hash, severity_rank"}
+
+
+@pytest.mark.django_db
+def test_unverified_list_cursor_pagination():
+    client = APIClient()
+
+    drafts = [Incident.objects.create(title=f"Draft {i}", report_raw="raw " * 1000, verified=False) for i in range(5)]
+    Incident.objects.create(title="Verified", verified=True)
+
+    response = client.get("/api/incidents/unverified?page_size=2")
+    assert response.status_code == 200
+    data = response.json()
+    titles = [r["title"] for r in data["results"]]
+    assert "report_raw" not in data["results"][0]
+
+    while data["next"]:
+        data = client.get(data["next"]).json()
+        titles += [r["title"] for r in data["results"]]
+
+    assert titles == [d.title for d in drafts]
+
+
+@pytest.mark.django_db
+def test_incident_list_keyset_pagination():
+    client = APIClient()
+
+    dated = [Incident.objects.create(title=f"Dated {i}", date=f"2024-01-0{i % 3 + 1}", verified=True) for i in range(5)]
+    undated = [Incident.objects.create(title=f"Undated {i}", verified=True) for i in range(2)]
+
+    def browse(order_by):
+        data = client.get(f"/api/incidents?pagination=keyset&order_by={order_by}&page_size=2&count=false").json()
+        assert data["count"] is None
+        uuids = [r["uuid"] for r in data["results"]]
+        while data["next"]:
+            data = client.get(data["next"]).json()
+            uuids += [r["uuid"] for r in data["results"]]
+        return uuids
+
+    expected = [str(i.uuid) for i in sorted(dated, key=lambda i: (i.date, i.id))]
+    assert browse("date") == [str(i.uuid) for i in undated] + expected
+    assert browse("-date") == expected[::-1] + [str(i.uuid) for i in reversed(undated)]
+
+    response = client.get("/api/incidents?pagination=keyset&order_by=created_at")
+    assert response.json()["count"] == 7
+
+    # Malformed orderings are ignored like in apply_ordering, falling back to page numbers
+    response = client.get("/api/incidents?pagination=keyset&order_by=--date")
+    assert response.status_code == 200
+    assert response.json()["count"] == 7
+
+
+@pytest.mark.django_db
+def test_incident_list_keyset_rejects_tampered_cursor():
+    client = APIClient()
+    Incident.objects.create(title="Dated", date="2024-01-01", verified=True)
+
+    def cursor(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+    for order_by, data in [
+        ("-date", {"v": "abc", "id": 1}),
+        ("date", {"v": [1], "id": 1}),
+        ("flight_altitude", {"v": {"a": 1}, "id": 1}),
+        ("created_at", {"v": "2024-01-01T00:00:00", "id": "x"}),
+        ("-date", [1, 2]),
+    ]:
+        response = client.get("/api/incidents", {"pagination": "keyset", "order_by": order_by, "cursor": cursor(data)})
+        assert response.status_code == 404
+
+    response = client.get("/api/incidents", {"pagination": "keyset", "cursor": "not-base64!"})
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_incident_list_without_count():
+    client = APIClient()
+
+    for i in range(3):
+        Incident.objects.create(title=f"Incident {i}", verified=True)
+
+    data = client.get("/api/incidents?count=false&page_size=2").json()
+    assert data["count"] is None
+    assert len(data["results"]) == 2
+    assert data["next"] is not None
+
+    data = client.get(data["next"]).json()
+    assert len(data["results"]) == 1
+    assert data["next"] is None
+    assert data["previous"] is not None
+
+
+@pytest.mark.django_db
+def test_incident_list_severity_ordering():
+    client = APIClient()
+
+    Incident.objects.create(title="Unknown", verified=True)
+    Incident.objects.create(title="Fatal", severity="fatal", verified=True)
+    Incident.objects.create(title="Minor", severity="minor", verified=True)
+    serious = Incident.objects.create(title="Serious", severity="minor", verified=True)
+    serious.severity = "serious"
+    serious.save(update_fields=["severity"])
+
+    response = client.get("/api/incidents?order_by=-severity")
+    assert [r["title"] for r in response.json()["results"]] == ["Fatal", "Serious", "Minor", "Unknown"]
+
+    response = client.get("/api/incidents?order_by=severity")
+    assert [r["title"] for r in response.json()["results"]] == ["Minor", "Serious", "Fatal", "Unknown"]
+
+
+@pytest.mark.django_db
+def test_incident_list_year_filters():
+    client = APIClient()
+
+    Incident.objects.create(title="2019", date="2019-12-31", verified=True)
+    Incident.objects.create(title="2020", date="2020-01-01", verified=True)
+    Incident.objects.create(title="2022", date="2022-12-31", verified=True)
+    Incident.objects.create(title="2023", date="2023-01-01", verified=True)
+
+    response = client.get("/api/incidents?year_min=2020&year_max=2022&order_by=date")
+    assert [r["title"] for r in response.json()["results"]] == ["2020", "2022"]
+
+    response = client.get("/api/incidents?exclude_year_max=2022&order_by=date")
+    assert [r["title"] for r in response.json()["results"]] == ["2023"]
+
+    response = client.post("/api/year_stats", data={"include": {"year_min": 2020}}, format="json")
+    assert response.json() == [{"year": 2020, "count": 1}, {"year": 2022, "count": 1}, {"year": 2023, "count": 1}]
+
+
+@pytest.mark.django_db
+def test_wind_speed_percentiles():
+    client = APIClient()
+
+    for ws in [1.0, 2.0, 3.0, 4.0, 5.0]:
+        Incident.objects.create(title=f"Wind {ws}", wind_speed_ms=ws, verified=True)
+    Incident.objects.create(title="No wind", verified=True)
+
+    response = client.post("/api/wind_speed_percentile", data={"percentile": 40}, format="json")
+    assert response.json() == {"percentile_value": 3.0}
+
+    response = client.post("/api/wind_speed_percentile", data={"percentiles": [0, 50, 100]}, format="json")
+    assert response.json() == {"percentile_values": [1.0, 3.0, 5.0]}
+
+    response = client.post(
+        "/api/wind_speed_percentile",
+        data={"percentiles": [50], "include": {"wind_speed_ms_min": 10}},
+        format="json",
+    )
+    assert response.json() == {"percentile_values": [None]}
+
+    response = client.post("/api/wind_speed_percentile", data={"percentiles": [150]}, format="json")
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_stats_responses_cached_until_data_changes():
+    client = APIClient()
+
+    Incident.objects.create(title="Spain", country="Spain", verified=True)
+
+    with patch("incidents.views.get_snapshot", wraps=get_snapshot) as snapshot:
+        for _ in range(2):
+            response = client.post("/api/country_stats", data={"include": {}, "exclude": {}}, format="json")
+            assert response.json() == [{"country": "Spain", "count": 1}]
+        assert snapshot.call_count == 1
+
+        # Key order in the body does not matter
+        client.post("/api/country_stats", data={"exclude": {}, "include": {}}, format="json")
+        assert snapshot.call_count == 1
+
+        Incident.objects.create(title="France", country="France", verified=True)
+        response = client.post("/api/country_stats", data={"include": {}, "exclude": {}}, format="json")
+        assert {c["country"] for c in response.json()} == {"Spain", "France"}
+        assert snapshot.call_count == 2
+
+
+@pytest.mark.django_db
+def test_incident_etags():
+    client = APIClient()
+
+    incident = Incident.objects.create(title="Cached", verified=True)
+
+    for url in [f"/api/incident/{incident.uuid}", "/api/incidents?page_size=5"]:
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response["ETag"]
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        incident.title = "Changed"
+        incident.save()
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_semantic_search_list_has_no_etag():
+    client = APIClient()
+    Incident.objects.create(title="Cached", verified=True)
+
+    with patch("incidents.views.ai_communicator.get_embedding", return_value=[0.1] * 3072):
+        response = client.get("/api/incidents?semantic_search=collapse")
+    assert response.status_code == 200
+    assert not response.has_header("ETag")
+
+
+@pytest.mark.django_db
+def test_refresh_search_text_bumps_data_version():
+    incident = Incident.objects.create(title="Reserve tangled", verified=True)
+    Incident.all_objects.filter(pk=incident.pk).update(search_text="stale", search_hash="stale")
+    version = DataVersion.current()
+    client = APIClient()
+    url = f"/api/incident/{incident.uuid}"
+    etag = client.get(url)["ETag"]
+
+    call_command("refresh_search_text", stdout=io.StringIO())
+    assert DataVersion.current() != version
+    assert search_fts("tangled") == [incident.id]
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "Reserve tangled" in response.json()["text_content"]
+
+    version = DataVersion.current()
+    call_command("refresh_search_text", stdout=io.StringIO())
+    assert DataVersion.current() == version
+
+
+@pytest.mark.django_db
+def test_search_index_refreshed_only_when_text_changes():
+    client = APIClient()
+    editor = User.objects.create_user(username="editor", password="editor123", is_staff=True)
+    client.force_authenticate(user=editor)
+
+    incident = Incident.objects.create(title="Tree landing", country="France", verified=True)
+    assert incident.search_text == incident.to_text()
+    # Title is indexed as its own FTS column, so only the rest of the document goes to search_extra
+    assert "Tree landing" in incident.search_text
+    assert "Tree landing" not in incident.search_extra
+    assert "Country: France" in incident.search_extra
+
+    with patch("incidents.search_index.ai_communicator.get_embedding", return_value=[0.1] * 3072) as get_embedding:
+        url = f"/api/incident/{incident.uuid}/update"
+        client.put(url, data={"incident_data": {"city_or_site": "Annecy"}}, format="json")
+        assert get_embedding.call_count == 1
+        assert search_fts("Annecy") == [incident.id]
+
+        # Same values again: the search text and its hash do not change
+        client.put(url, data={"incident_data": {"city_or_site": "Annecy"}}, format="json")
+        assert get_embedding.call_count == 1
+
+    incident.refresh_from_db()
+    assert incident.indexed_hash == incident.search_hash
+    assert client.get(f"/api/incident/{incident.uuid}").json()["text_content"] == incident.search_text
+
+
+@pytest.mark.django_db
+def test_generate_embeddings_marks_incidents_indexed():
+    incidents = [Incident.objects.create(title=f"Tree landing {i}", verified=True) for i in range(3)]
+    assert all(incident.indexed_hash == "" for incident in incidents)
+
+    with patch("incidents.management.commands.generate_embeddings.ai_communicator.fetch_embeddings",
+               side_effect=lambda texts: [[0.1] * 3072 for _ in texts]):
+        call_command("generate_embeddings", stdout=io.StringIO())
+
+    with patch("incidents.search_index.ai_communicator.get_embedding") as get_embedding:
+        for incident in incidents:
+            incident.refresh_from_db()
+            assert incident.indexed_hash == incident.search_hash
+            assert refresh_search_index(incident) is False
+    get_embedding.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_fts_follows_incident_writes():
+    first = Incident.objects.create(title="Reserve tangled over lake", verified=True)
+    second = Incident.objects.create(title="Engine out near trees", verified=True)
+    assert search_fts("tangled") == [first.id]
+
+    first.title = "Reserve opened fine"
+    first.save()
+    assert search_fts("tangled") == []
+    assert search_fts("opened") == [first.id]
+
+    # Writes that bypass save() are picked up too, as long as they change an indexed column
+    Incident.all_objects.filter(pk=second.pk).update(title="Motor quit", search_extra="Location: forest")
+    assert search_fts("engine out") == []
+    assert search_fts("forest") == [second.id]
+
+    first.delete()
+    assert search_fts("opened") == []
+    assert get_indexed_incident_ids() == {second.id}
+
+    call_command("generate_fts_index", stdout=io.StringIO())
+    assert search_fts("forest") == [second.id]
+    assert get_indexed_incident_ids() == {second.id}
+
+
+def _fts_triggers():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'fts_incidents_%' ORDER BY name")
+        return [row[0] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_fts_triggers_survive_table_remake():
+    before = Incident.objects.create(title="Reserve tangled over lake", verified=True)
+
+    # AlterField on SQLite copies incidents_incident into a new table and drops the old one,
+    # taking the FTS triggers with it
+    old_field = Incident._meta.get_field("title")
+    new_field = models.CharField(max_length=400, null=True, blank=True)
+    new_field.set_attributes_from_name("title")
+    new_field.model = Incident
+    with connection.schema_editor() as editor:
+        editor.alter_field(Incident, old_field, new_field)
+        editor.alter_field(Incident, new_field, old_field)
+    assert _fts_triggers() == []
+
+    during = Incident.objects.create(title="Engine out near trees", verified=True)
+    emit_post_migrate_signal(verbosity=0, interactive=False, db="default")
+    assert _fts_triggers() == ["fts_incidents_ad", "fts_incidents_ai", "fts_incidents_au"]
+
+    # Writes made without triggers are picked up by the rebuild, later writes by the triggers
+    assert search_fts("engine out") == [during.id]
+    before.title = "Reserve opened fine"
+    before.save()
+    assert search_fts("tangled") == []
+    assert search_fts("opened") == [before.id]
+
+
+@pytest.mark.django_db
+def test_text_search_snippets_rank_by_column_weight():
+    in_report = Incident.objects.create(
+        title="Hard landing",
+        report_raw="Witness said the <b>harness</b> buckle opened before the landing.",
+        verified=True,
+    )
+    in_title = Incident.objects.create(title="Harness buckle failure", verified=True)
+    Incident.objects.create(title="Harness buckle draft", verified=False)
+
+    client = APIClient()
+    response = client.get("/api/incidents/text_search", {"q": "buckle"})
+    assert response.status_code == 200
+    results = response.json()["results"]
+
+    assert [r["uuid"] for r in results] == [str(in_title.uuid), str(in_report.uuid)]
+    assert results[0]["title"] == "Harness <mark>buckle</mark> failure"
+    assert results[0]["score"] > results[1]["score"]
+    assert "<mark>buckle</mark>" in results[1]["snippet"]
+    assert "&lt;b&gt;harness&lt;/b&gt;" in results[1]["snippet"]
+    assert "report_raw" not in results[1]
+
+    assert client.get("/api/incidents/text_search").status_code == 400
+
+
+@pytest.mark.django_db
+def test_rank_by_ids_rankings_are_independent():
+    first, second, third = (Incident.objects.create(title=f"Ranked {i}", verified=True) for i in range(3))
+
+    forward = rank_by_ids(Incident.objects.all(), [third.id, first.id])
+    backward = rank_by_ids(Incident.objects.all(), [first.id, second.id, third.id][::-1])
+
+    # Both querysets are evaluated after both rankings were built
+    assert list(forward) == [third, first]
+    assert list(backward) == [third, second, first]
+    assert forward.count() == 2
+
+
+@pytest.mark.django_db
+def test_snapshot_filter_mask_cache_is_bounded():
+    Incident.objects.create(title="Spain", country="Spain", verified=True)
+    snapshot = get_snapshot()
+
+    for i in range(snapshot._mask_cache.maxsize + 50):
+        snapshot.filter_mask({"primary_cause": f"cause_{i}"}, {})
+    assert len(snapshot._mask_cache) == snapshot._mask_cache.maxsize
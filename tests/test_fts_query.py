@@ -0,0 +1,67 @@
+import pytest
+from rest_framework.test import APIClient
+
+from incidents.models import Incident
+from ppg_incidents.fts_query import MAX_TERMS, compile_query
+from ppg_incidents.fts_store import search_fts
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("reserve", '"reserve"'),
+    ("reserve tangled", '("reserve" AND "tangled")'),
+    ("reserve OR rescue", '("reserve" OR "rescue")'),
+    ("engine NOT tree", '("engine" NOT "tree")'),
+    ('"line twist" tang*', '("line twist" AND "tang"*)'),
+    ("title:reserve", '{title} : "reserve"'),
+    ('causes:(wind OR gust)', '{causes_description} : (("wind" OR "gust"))'),
+    ("engine in lake", '("engine" AND "lake")'),
+    ("https://example.com/a:b", '"https://example.com/a:b"'),
+    ('say "hi" or not', '("say" AND "not")'),
+    ('unterminated "quote', '("unterminated" AND "quote")'),
+    ('wing ""x"" collapse', '("wing" AND "collapse")'),
+    ("reserve ab NOT tree", '("reserve" NOT "tree")'),
+    ("engine in NOT lake", '("engine" NOT "lake")'),
+    ("wing engine in NOT lake", '(("wing" AND "engine") NOT "lake")'),
+    ("engine NOT ab", '"engine"'),
+])
+def test_compile_query(query, expected):
+    assert compile_query(query) == expected
+
+
+def test_compile_query_precedence():
+    assert compile_query("wing OR engine tree NOT lake") == '("wing" OR ("engine" AND ("tree" NOT "lake")))'
+
+
+@pytest.mark.parametrize("query", [
+    "",
+    "OR engine",
+    "engine AND",
+    "(engine",
+    "engine)",
+    "title:(summary:engine)",
+    "ab OR cd",
+    "ab NOT tree",
+    "engine OR ab NOT tree",
+    "((((( engine )))))",
+    " ".join(["engine"] * (MAX_TERMS + 1)),
+])
+def test_compile_query_rejects(query):
+    with pytest.raises(ValueError):
+        compile_query(query)
+
+
+@pytest.mark.django_db
+def test_text_search_query_language():
+    tangled = Incident.objects.create(title="Reserve tangled in lines", verified=True)
+    lake = Incident.objects.create(title="Landed in lake", summary="Reserve thrown over the lake", verified=True)
+
+    assert search_fts("reserve lines") == [tangled.id]
+    assert set(search_fts("tangled OR lake")) == {tangled.id, lake.id}
+    assert search_fts("reserve NOT lake") == [tangled.id]
+    assert search_fts("title:reserve") == [tangled.id]
+    assert search_fts('"thrown over"') == [lake.id]
+
+    client = APIClient()
+    response = client.get("/api/incidents", {"text_search": "reserve AND"})
+    assert response.status_code == 400
+    assert "text_search" in response.json()
@@ -0,0 +1,55 @@
+import uuid
+
+import pytest
+from django.db.models import Count, F
+
+from incidents.filters import apply_filters
+from incidents.models import Incident
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("queryset, index", [
+    (lambda: Incident.objects.all()[:15], "incident_verified_date_idx"),
+    (lambda: Incident.objects.filter(country="Spain").values("country").annotate(count=Count("id")), "incident_verified_country_idx"),
+    (lambda: Incident.objects.filter(country="Spain", date="2024-05-01").order_by().values_list("id"), "incident_country_date_idx"),
+    (lambda: Incident.objects.filter(country="Spain", pilot_name="John").order_by().values_list("id"), "incident_country_pilot_idx"),
+    (lambda: Incident.all_objects.filter(original_uuid=uuid.uuid4()).order_by("-created_at"), "incident_original_uuid_idx"),
+    (lambda: Incident.objects.order_by(F("severity_rank").desc(nulls_last=True), "-date")[:15], "incident_severity_rank_idx"),
+    (lambda: Incident.objects.order_by(F("severity_rank").asc(nulls_last=True), "date")[:15], "incident_severity_rank_idx"),
+])
+def test_query_uses_index(queryset, index):
+    plan = queryset().explain()
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan, plan
+
+
+@pytest.mark.django_db
+def test_severity_ordering_uses_no_temp_sort():
+    plan = Incident.objects.order_by(F("severity_rank").desc(nulls_last=True), "-date")[:15].explain()
+    assert "TEMP B-TREE" not in plan, plan
+
+
+@pytest.mark.django_db
+def test_year_filters_use_date_index():
+    queryset = apply_filters(Incident.objects.all(), {"year_min": "2020", "year_max": "2022"}, exclude=False)
+    sql = str(queryset.query)
+    assert "django_date_extract" not in sql
+    plan = queryset.explain()
+    assert "date>? AND date<?" in plan, plan
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("exclude", [False, True])
+def test_collapse_filter_starts_from_collapse_type_index(exclude):
+    queryset = apply_filters(Incident.objects.all(), {"collapse": "true"}, exclude=exclude)
+    plan = queryset.explain()
+    assert "CORRELATED" not in plan, plan
+    assert "USING COVERING INDEX collapse_type_incident_idx (collapse_type=?)" in plan, plan
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("exclude", [False, True])
+def test_has_video_filter_uses_youtube_id_index(exclude):
+    queryset = apply_filters(Incident.objects.all(), {"has_video": "true"}, exclude=exclude)
+    plan = queryset.explain()
+    assert "CORRELATED" not in plan, plan
+    assert "incidents_incidentlink_youtube_id" in plan, plan